@@ -2,13 +2,17 @@ from django.contrib import admin
 from .models import (
     ClassRoom,
     Exam,
+    Job,
     Permission,
+    PublishedResultSnapshot,
     Result,
     ResultPublication,
     Role,
     RolePermission,
     Student,
+    StudentExamSummary,
     Subject,
+    SubjectExamAggregate,
     UserRole,
 )
 
@@ -22,3 +26,7 @@ admin.site.register(Subject)
 admin.site.register(Exam)
 admin.site.register(Result)
 admin.site.register(ResultPublication)
+admin.site.register(StudentExamSummary)
+admin.site.register(SubjectExamAggregate)
+admin.site.register(PublishedResultSnapshot)
+admin.site.register(Job)
@@ -0,0 +1,131 @@
+import numpy as np
+
+from .models import Result, Student, Subject
+from .grading import scale_for_exam
+
+PERCENTILES = (10, 25, 50, 75, 90)
+
+
+def load_mark_matrix(class_room, exam):
+    """Load a class's marks for an exam as a students x subjects float matrix.
+
+    Missing marks are NaN. Returns ``(students, subjects, matrix)`` where the
+    first two are the row and column labels.
+    """
+    students = list(
+        Student.objects.filter(class_room=class_room)
+        .order_by("first_name", "last_name")
+        .values("id", "reg_no", "first_name", "last_name")
+    )
+    subjects = list(Subject.objects.filter(class_room=class_room).order_by("name").values("id", "name", "code"))
+    row_index = {student["id"]: index for index, student in enumerate(students)}
+    column_index = {subject["id"]: index for index, subject in enumerate(subjects)}
+
+    matrix = np.full((len(students), len(subjects)), np.nan)
+    marks = Result.objects.filter(exam=exam, student__class_room=class_room).values_list(
+        "student_id", "subject_id", "marks"
+    )
+    for student_id, subject_id, value in marks:
+        row = row_index.get(student_id)
+        column = column_index.get(subject_id)
+        if row is not None and column is not None:
+            matrix[row, column] = float(value)
+    return students, subjects, matrix
+
+
+def _round(value):
+    return None if value is None or np.isnan(value) else round(float(value), 2)
+
+
+def describe(values):
+    """Summary statistics of a 1-D array, ignoring NaNs."""
+    values = values[~np.isnan(values)]
+    if not values.size:
+        return {"count": 0, "mean": None, "median": None, "std": None, "min": None, "max": None, "percentiles": {}}
+    return {
+        "count": int(values.size),
+        "mean": _round(values.mean()),
+        "median": _round(np.median(values)),
+        "std": _round(values.std()),
+        "min": _round(values.min()),
+        "max": _round(values.max()),
+        "percentiles": {
+            str(percentile): _round(value)
+            for percentile, value in zip(PERCENTILES, np.percentile(values, PERCENTILES))
+        },
+    }
+
+
+def grade_histogram(values, scale):
+    """Count non-NaN marks per grade band of ``scale``, lowest grade first."""
+    values = values[~np.isnan(values)]
+    edges = [0.0] + [float(minimum) for minimum in scale.minimums[1:]] + [np.inf]
+    counts, _ = np.histogram(values, bins=edges)
+    return dict(zip(scale.grades, (int(count) for count in counts)))
+
+
+def correlation_matrix(matrix):
+    """Pairwise Pearson correlation between subject columns.
+
+    Each pair uses only the students who have marks in both subjects; pairs
+    with fewer than two such students or no variance are ``None``.
+    """
+    columns = matrix.shape[1]
+    if not columns:
+        return []
+    present = ~np.isnan(matrix)
+    if present.all() and matrix.shape[0] > 1:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            full = np.corrcoef(matrix, rowvar=False)
+        return [[_round(value) for value in np.atleast_1d(row)] for row in np.atleast_2d(full)]
+
+    result = [[None] * columns for _ in range(columns)]
+    for i in range(columns):
+        for j in range(i, columns):
+            both = present[:, i] & present[:, j]
+            if both.sum() < 2:
+                continue
+            x, y = matrix[both, i], matrix[both, j]
+            if x.std() == 0 or y.std() == 0:
+                continue
+            value = _round(np.corrcoef(x, y)[0, 1])
+            result[i][j] = result[j][i] = value
+    return result
+
+
+def class_statistics(class_room, exam):
+    students, subjects, matrix = load_mark_matrix(class_room, exam)
+    scale = scale_for_exam(exam)
+    pass_mark = float(scale.pass_mark)
+    present = ~np.isnan(matrix)
+    sat = present.sum(axis=0)
+    passed = (np.nan_to_num(matrix, nan=-1.0) >= pass_mark).sum(axis=0)
+
+    has_marks = present.any(axis=1)
+    totals = np.where(has_marks, np.nansum(matrix, axis=1), np.nan)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        averages = totals / present.sum(axis=1)
+
+    subject_stats = []
+    for index, subject in enumerate(subjects):
+        column = matrix[:, index]
+        subject_stats.append(
+            {
+                **subject,
+                **describe(column),
+                "pass_rate": _round(passed[index] / sat[index] * 100) if sat[index] else None,
+                "histogram": grade_histogram(column, scale),
+            }
+        )
+
+    return {
+        "students": len(students),
+        "overall": {**describe(matrix.ravel()), "histogram": grade_histogram(matrix.ravel(), scale)},
+        "student_totals": describe(totals),
+        "student_averages": describe(averages),
+        "subjects": subject_stats,
+        "correlation": {
+            "subjects": [subject["id"] for subject in subjects],
+            "matrix": correlation_matrix(matrix),
+        },
+    }
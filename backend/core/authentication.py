@@ -0,0 +1,73 @@
+from django.conf import settings
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import UserRole
+from .permissions import get_user_permission_codes, permission_version
+
+ROLES_CLAIM = "roles"
+PERMISSIONS_CLAIM = "permissions"
+PERMISSION_VERSION_CLAIM = "permission_version"
+
+
+class PermissionClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Login serializer that embeds roles and permission codes in the tokens
+    when ``JWT_EMBED_PERMISSIONS`` is enabled."""
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        if settings.JWT_EMBED_PERMISSIONS:
+            token["username"] = user.get_username()
+            token["is_staff"] = user.is_staff
+            token["is_superuser"] = user.is_superuser
+            token[ROLES_CLAIM] = list(UserRole.objects.filter(user=user).values_list("role__name", flat=True))
+            # Read the shared version first so the codes are loaded under it.
+            token[PERMISSION_VERSION_CLAIM] = permission_version(refresh=True)
+            token[PERMISSIONS_CLAIM] = sorted(get_user_permission_codes(user))
+        return token
+
+
+class PermissionClaimsUser(TokenUser):
+    """Stateless user built from token claims; its permission set is already
+    memoized, so ``HasPermission`` never touches the database."""
+
+    def __init__(self, token):
+        super().__init__(token)
+        self._permission_codes_cache = set(token[PERMISSIONS_CLAIM])
+
+    # SimpleJWT stores the user id claim as a string; ownership checks compare
+    # it with integer foreign keys.
+    @cached_property
+    def id(self):
+        return int(self.token[api_settings.USER_ID_CLAIM])
+
+    @cached_property
+    def pk(self):
+        return self.id
+
+    @property
+    def roles(self):
+        return list(self.token.get(ROLES_CLAIM, []))
+
+
+class PermissionClaimsJWTAuthentication(JWTAuthentication):
+    """JWT authentication that skips the user lookup for claim-bearing tokens.
+
+    Tokens issued before the last role or permission change carry an old
+    permission version and are rejected, forcing a fresh login.
+    """
+
+    def get_user(self, validated_token):
+        if not settings.JWT_EMBED_PERMISSIONS or PERMISSIONS_CLAIM not in validated_token:
+            return super().get_user(validated_token)
+        # A token from a process that saw a newer bump than this one has yet
+        # to read is checked again against the shared version.
+        token_version = validated_token.get(PERMISSION_VERSION_CLAIM)
+        if token_version != permission_version() and token_version != permission_version(refresh=True):
+            raise InvalidToken("Token permissions are out of date, please log in again.")
+        return PermissionClaimsUser(validated_token)
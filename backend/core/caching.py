@@ -0,0 +1,68 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+ROSTER_VERSION_KEY = "core:roster:version"
+GRADING_VERSION_KEY = "core:grading:version"
+
+# ``key -> (version, read_at)``; versions read from the shared cache are
+# trusted for ``CACHE_VERSION_TTL`` seconds so hot paths do not pay a cache
+# round trip (a SQL query under the database cache) on every lookup.
+_local_versions = {}
+_local_lock = threading.Lock()
+
+
+def exam_version_key(exam_id):
+    return f"core:exam:{exam_id}:version"
+
+
+def _remember(key, version):
+    with _local_lock:
+        _local_versions[key] = (version, time.monotonic())
+    return version
+
+
+def clear_local_versions():
+    with _local_lock:
+        _local_versions.clear()
+
+
+def get_version(key, refresh=False):
+    """The shared version under ``key``.
+
+    Bumps made in this process are seen at once; bumps made by other
+    processes within ``CACHE_VERSION_TTL`` seconds, or at once with
+    ``refresh``.
+    """
+    memo = _local_versions.get(key)
+    if not refresh and memo is not None and time.monotonic() - memo[1] < settings.CACHE_VERSION_TTL:
+        return memo[0]
+    version = cache.get(key)
+    if version is None:
+        version = int(time.time() * 1000)
+        if not cache.add(key, version, timeout=None):
+            version = cache.get(key)
+    return _remember(key, version)
+
+
+def bump_version(key):
+    try:
+        version = cache.incr(key)
+    except ValueError:
+        version = int(time.time() * 1000)
+        cache.set(key, version, timeout=None)
+    _remember(key, version)
+
+
+def bump_exam_version(exam_id):
+    bump_version(exam_version_key(exam_id))
+
+
+def bump_roster_version():
+    bump_version(ROSTER_VERSION_KEY)
+
+
+def bump_grading_version():
+    bump_version(GRADING_VERSION_KEY)
@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.checks import Error, register
+
+# Backends whose entries are private to one process; version bumps made in
+# one worker would never reach the others.
+PROCESS_LOCAL_CACHES = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+@register()
+def check_shared_cache(app_configs, **kwargs):
+    backend = settings.CACHES.get("default", {}).get("BACKEND")
+    if settings.DEBUG or backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [
+        Error(
+            f"The default cache backend {backend} is private to each process.",
+            hint=(
+                "Permission, exam and grading versions must be shared by every web and job worker; "
+                "use the database cache, Redis or Memcached."
+            ),
+            id="core.E001",
+        )
+    ]
@@ -0,0 +1,173 @@
+import threading
+import time
+from bisect import bisect_right
+from collections import defaultdict
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import Case, Count, DecimalField, ExpressionWrapper, F, Q, Value, When
+
+from .caching import GRADING_VERSION_KEY, get_version
+from .models import ClassRoom, Exam, GradeBoundary, GradingScale
+
+# ``(grade, min_marks, remarks, is_pass)``; used when no scale is configured.
+STANDARD_BOUNDARIES = (
+    ("A", Decimal("81"), "KIPAWA", True),
+    ("B", Decimal("61"), "MICHIPUO", True),
+    ("C", Decimal("41"), "PASS", True),
+    ("D", Decimal("21"), "PASS", True),
+    ("F", Decimal("0"), "FAIL", False),
+)
+
+
+class Scale:
+    """A grading scale's boundaries sorted for ``bisect`` lookups.
+
+    Marks below the lowest boundary still earn the lowest grade.
+    """
+
+    def __init__(self, boundaries, scale_id=None):
+        ordered = sorted(boundaries, key=lambda boundary: boundary[1])
+        self.id = scale_id
+        self.boundaries = ordered
+        self.grades = [grade for grade, _, _, _ in ordered]
+        self.minimums = [min_marks for _, min_marks, _, _ in ordered]
+        self.remarks = {grade: remarks for grade, _, remarks, _ in ordered}
+        self.fail_grades = {grade for grade, _, _, is_pass in ordered if not is_pass}
+        passing = [min_marks for _, min_marks, _, is_pass in ordered if is_pass]
+        self.pass_mark = min(passing) if passing else None
+
+    @classmethod
+    def thaw(cls, frozen):
+        return cls([(grade, Decimal(min_marks), remarks, is_pass) for grade, min_marks, remarks, is_pass in frozen])
+
+    def freeze(self):
+        """JSON-ready boundaries, the inverse of ``thaw``."""
+        return [[grade, str(min_marks), remarks, is_pass] for grade, min_marks, remarks, is_pass in self.boundaries]
+
+    def grade(self, marks):
+        return self.grades[max(bisect_right(self.minimums, marks) - 1, 0)]
+
+    def remarks_for(self, grade):
+        return self.remarks.get(grade, "")
+
+    def bands(self):
+        """``(grade, lower, upper)`` from the top grade down; the lowest band has no ``lower``."""
+        bands = []
+        upper = None
+        for index in range(len(self.grades) - 1, -1, -1):
+            bands.append((self.grades[index], self.minimums[index] if index else None, upper))
+            upper = self.minimums[index]
+        return bands
+
+    def case(self, field, per=None):
+        """SQL ``CASE`` giving the grade of ``field``, or of ``field / per`` when ``per`` is set."""
+
+        def threshold(minimum):
+            if per is None:
+                return minimum
+            return ExpressionWrapper(F(per) * Value(minimum), output_field=DecimalField())
+
+        whens = [
+            When(**{f"{field}__gte": threshold(minimum)}, then=Value(grade))
+            for grade, minimum, _ in self.bands()
+            if minimum is not None
+        ]
+        return Case(*whens, default=Value(self.grades[0]))
+
+    def count_aggregates(self, field="grade"):
+        """``Count`` aggregates of the stored grade ``field``, one per grade from the top down."""
+        return {grade: Count("id", filter=Q(**{field: grade})) for grade in reversed(self.grades)}
+
+
+STANDARD_SCALE = Scale(STANDARD_BOUNDARIES)
+
+
+def load_scales():
+    """Read every scale from the database as ``(scales, default_id, class_scale_ids)``."""
+    boundaries = defaultdict(list)
+    for scale_id, *boundary in GradeBoundary.objects.values_list(
+        "scale_id", "grade", "min_marks", "remarks", "is_pass"
+    ):
+        boundaries[scale_id].append(boundary)
+    scales = {scale_id: Scale(rows, scale_id) for scale_id, rows in boundaries.items()}
+    default_id = GradingScale.objects.filter(is_default=True).values_list("id", flat=True).first()
+    class_scale_ids = dict(ClassRoom.objects.exclude(grading_scale=None).values_list("id", "grading_scale_id"))
+    return scales, default_id, class_scale_ids
+
+
+class ScaleCache:
+    """Process-local copy of every grading scale.
+
+    Lookups compare the grading version, bumped whenever a scale, boundary
+    or class changes, and reload everything when it has moved. The version
+    itself is re-read from the shared cache at most once per
+    ``CACHE_VERSION_TTL`` seconds, so warm lookups run no queries and all
+    workers still follow edits. The copy is also reloaded after
+    ``GRADING_SCALE_CACHE_TTL`` seconds in case a bump never reaches this
+    process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._loaded_at = 0.0
+        self._state = ({}, None, {})
+
+    def _is_current(self, version):
+        return version == self._version and time.monotonic() - self._loaded_at < settings.GRADING_SCALE_CACHE_TTL
+
+    def state(self):
+        version = get_version(GRADING_VERSION_KEY)
+        if not self._is_current(version):
+            with self._lock:
+                if not self._is_current(version):
+                    self._state = load_scales()
+                    self._version = version
+                    self._loaded_at = time.monotonic()
+        return self._state
+
+    def clear(self):
+        with self._lock:
+            self._version = None
+
+    def resolve(self, exam_scale_id=None, class_room_id=None):
+        scales, default_id, class_scale_ids = self.state()
+        scale_id = exam_scale_id or class_scale_ids.get(class_room_id) or default_id
+        return scales.get(scale_id, STANDARD_SCALE)
+
+
+scale_cache = ScaleCache()
+
+
+def default_scale():
+    return scale_cache.resolve()
+
+
+def scale_for_class(class_room_id):
+    return scale_cache.resolve(class_room_id=class_room_id)
+
+
+def scale_for_exam(exam):
+    """The exam's scale; published exams keep the boundaries frozen at publish."""
+    if exam.is_published and exam.grading_boundaries:
+        return Scale.thaw(exam.grading_boundaries)
+    return scale_cache.resolve(exam.grading_scale_id, exam.class_room_id)
+
+
+def scales_for_exams(exam_ids):
+    """Map exam ids to their scales with one query."""
+    return {
+        exam.id: scale_for_exam(exam)
+        for exam in Exam.objects.filter(id__in=exam_ids).only(
+            "id", "grading_scale_id", "class_room_id", "is_published", "grading_boundaries"
+        )
+    }
+
+
+def grade_for_marks(marks, scale=None):
+    return (scale or default_scale()).grade(marks)
+
+
+def remarks_for_grade(grade, scale=None):
+    return (scale or default_scale()).remarks_for(grade)
@@ -0,0 +1,216 @@
+import logging
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import ClassRoom, Exam, Job
+from .reports import class_report_cards, render_report_cards, stream_zip
+from .services import import_class_results_csv
+from .snapshots import published_report_cards
+
+logger = logging.getLogger(__name__)
+
+JOB_HANDLERS = {}
+
+
+class JobFailed(Exception):
+    """Raised by a handler to fail a job with a message and an optional result body."""
+
+    def __init__(self, message, result=None):
+        super().__init__(message)
+        self.result = result
+
+
+def job_handler(kind):
+    def register(func):
+        JOB_HANDLERS[kind] = func
+        return func
+
+    return register
+
+
+def enqueue(kind, payload=None, user=None, input_file=None, input_name=None):
+    """Queue a job for the ``run_jobs`` worker and return it."""
+    if kind not in JOB_HANDLERS:
+        raise ValueError(f"Unknown job kind '{kind}'.")
+    job = Job(kind=kind, payload=payload or {}, created_by_id=user.id if user else None)
+    if input_file is not None:
+        job.input_file.save(input_name or getattr(input_file, "name", kind), input_file, save=False)
+    job.save()
+    return job
+
+
+def requeue_stale_jobs():
+    """Put running jobs whose worker stopped heartbeating back in the queue.
+
+    A job whose lease ran out on its last allowed attempt is failed instead,
+    so a job that keeps killing its worker cannot loop forever. Returns
+    ``(requeued, failed)``.
+    """
+    now = timezone.now()
+    cutoff = now - timedelta(seconds=settings.JOB_LEASE_TIMEOUT)
+    stale = Job.objects.filter(status=Job.STATUS_RUNNING).filter(
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at=None, started_at__lt=cutoff)
+    )
+    failed = stale.filter(attempts__gte=settings.JOB_MAX_ATTEMPTS).update(
+        status=Job.STATUS_FAILED, error="The worker stopped while running this job.", finished_at=now
+    )
+    requeued = stale.update(status=Job.STATUS_QUEUED, started_at=None, heartbeat_at=None)
+    for count, action in ((requeued, "Requeued"), (failed, "Failed")):
+        if count:
+            logger.warning("%s %s job(s) whose worker stopped heartbeating", action, count)
+    return requeued, failed
+
+
+def claim_next_job():
+    """Mark the oldest queued job as running and return it, or ``None``.
+
+    ``SKIP LOCKED`` lets any number of workers poll the same table without
+    handing the same job out twice. Jobs abandoned by a crashed worker are
+    requeued first.
+    """
+    requeue_stale_jobs()
+    with transaction.atomic():
+        job = (
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status=Job.STATUS_QUEUED)
+            .order_by("created_at", "id")
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = Job.STATUS_RUNNING
+        job.started_at = job.heartbeat_at = timezone.now()
+        job.attempts += 1
+        job.save(update_fields=["status", "started_at", "heartbeat_at", "attempts"])
+    return job
+
+
+class Heartbeat:
+    """Renew a running job's lease from a separate thread until it returns.
+
+    Like progress, the heartbeat needs its own connection so it commits
+    while the handler's transaction is still open.
+    """
+
+    def __init__(self, job, interval=None):
+        self.job = job
+        self.interval = interval or settings.JOB_HEARTBEAT_INTERVAL
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._beat, name=f"job-{job.pk}-heartbeat", daemon=True)
+
+    def _beat(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                self.job.heartbeat()
+            except Exception:
+                logger.exception("Heartbeat for job %s failed", self.job.pk)
+            finally:
+                close_old_connections()
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stopped.set()
+        self._thread.join()
+
+
+def run_job(job):
+    handler = JOB_HANDLERS.get(job.kind)
+    try:
+        if handler is None:
+            raise JobFailed(f"Unknown job kind '{job.kind}'.")
+        with Heartbeat(job):
+            job.result = handler(job)
+        job.status = Job.STATUS_SUCCEEDED
+    except JobFailed as exc:
+        job.status = Job.STATUS_FAILED
+        job.error = str(exc)
+        job.result = exc.result
+    except Exception as exc:
+        logger.exception("Job %s (%s) failed", job.pk, job.kind)
+        job.status = Job.STATUS_FAILED
+        job.error = str(exc) or exc.__class__.__name__
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "result", "error", "output_file", "finished_at"])
+    return job
+
+
+class ProgressReporter:
+    """Record job progress from a separate thread, and so a separate connection.
+
+    Handlers usually run inside a transaction; progress written on the
+    handler's own connection would stay invisible to status polls until the
+    job had finished.
+    """
+
+    def __init__(self, job):
+        self.job = job
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+    def __call__(self, progress, total=None):
+        self._executor.submit(self._write, progress, total)
+
+    def _write(self, progress, total):
+        try:
+            self.job.set_progress(progress, total)
+        finally:
+            close_old_connections()
+
+    def close(self):
+        self._executor.submit(close_old_connections)
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+@job_handler("class_result_csv_import")
+def import_class_results_job(job):
+    exam = Exam.objects.filter(id=job.payload["exam_id"], class_room_id=job.payload["class_id"]).first()
+    if exam is None:
+        raise JobFailed("Exam not found.")
+    if exam.is_published:
+        raise JobFailed("Cannot edit results after exam is published.")
+    class_room = ClassRoom.objects.get(id=job.payload["class_id"])
+
+    with job.input_file.open("rb") as upload, ProgressReporter(job) as progress:
+        ok, data = import_class_results_csv(class_room, exam, upload, job.created_by, progress=progress)
+    if not ok:
+        raise JobFailed(data["detail"], data)
+    return data
+
+
+@job_handler("class_report_cards")
+def class_report_cards_job(job):
+    exam = Exam.objects.filter(id=job.payload["exam_id"], class_room_id=job.payload["class_id"]).first()
+    if exam is None:
+        raise JobFailed("Exam not found.")
+    cards = published_report_cards(exam) or class_report_cards(exam.class_room, exam)
+
+    def counted(files, progress):
+        for rendered, item in enumerate(files, start=1):
+            yield item
+            progress(rendered)
+
+    with ProgressReporter(job) as progress, tempfile.TemporaryFile() as archive:
+        progress(0, len(cards))
+        for chunk in stream_zip(counted(render_report_cards(cards), progress)):
+            archive.write(chunk)
+        archive.seek(0)
+        filename = f"class_{exam.class_room_id}_exam_{exam.id}_report_cards.zip"
+        job.output_file.save(filename, File(archive), save=False)
+    return {"report_cards": len(cards), "filename": os.path.basename(job.output_file.name)}
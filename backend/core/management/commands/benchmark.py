@@ -0,0 +1,232 @@
+import json
+import platform
+import statistics
+import time
+from decimal import Decimal
+
+import django
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core.analytics import class_statistics
+from core.instrumentation import SqlTimer
+from core.loadgen import seed_dataset
+from core.models import Result, Student, Subject
+from core.reports import class_report_cards, render_report_card, render_report_cards, stream_zip
+from core.serializers import ResultRowSerializer, ResultSerializer, StudentRowSerializer, StudentSerializer
+from core.services import (
+    analytics_for_class,
+    build_class_result_sheet,
+    calculate_rankings,
+    import_class_results_csv,
+    upsert_results,
+)
+
+
+CASES = {}
+ROW_COUNTS = {}
+
+
+def benchmark_case(name, rows=None):
+    """Register a case. It gets the seeded context and returns the callable to
+    time, so inputs are built outside the measured region. ``rows`` maps the
+    context to the number of rows a run handles, for a per-row timing."""
+
+    def register(func):
+        CASES[name] = func
+        if rows is not None:
+            ROW_COUNTS[name] = rows
+        return func
+
+    return register
+
+
+@benchmark_case("build_class_result_sheet")
+def sheet_case(ctx):
+    return lambda: build_class_result_sheet(ctx["class_room"], ctx["exam"])
+
+
+@benchmark_case("calculate_rankings")
+def rankings_case(ctx):
+    return lambda: calculate_rankings(Result.objects.filter(exam=ctx["exam"], student__class_room=ctx["class_room"]))
+
+
+@benchmark_case("analytics_for_class")
+def analytics_case(ctx):
+    return lambda: analytics_for_class(ctx["class_room"], ctx["exam"])
+
+
+@benchmark_case("class_statistics")
+def statistics_case(ctx):
+    return lambda: class_statistics(ctx["class_room"], ctx["exam"])
+
+
+@benchmark_case("csv_import")
+def csv_import_case(ctx):
+    header = "Reg no," + ",".join(subject.name for subject in ctx["subjects"])
+    lines = [header] + [
+        ",".join([student.reg_no] + [str((student.id * 7 + index) % 101) for index in range(len(ctx["subjects"]))])
+        for student in ctx["students"]
+    ]
+    content = "\n".join(lines).encode("utf-8")
+    return lambda: import_class_results_csv(
+        ctx["class_room"], ctx["exam"], SimpleUploadedFile("results.csv", content), None
+    )
+
+
+@benchmark_case("bulk_upload")
+def bulk_upload_case(ctx):
+    entries = [
+        (student.id, subject.id, ctx["exam"].id, Decimal((student.id + subject.id) % 101))
+        for student in ctx["students"]
+        for subject in ctx["subjects"]
+    ]
+    return lambda: upsert_results(entries)
+
+
+@benchmark_case("render_report_card")
+def report_card_case(ctx):
+    card = class_report_cards(ctx["class_room"], ctx["exam"])[0]
+    return lambda: render_report_card(card)
+
+
+@benchmark_case("class_report_cards_zip")
+def report_cards_zip_case(ctx):
+    def run():
+        for _ in stream_zip(render_report_cards(class_report_cards(ctx["class_room"], ctx["exam"]))):
+            pass
+
+    return run
+
+
+def result_count(ctx):
+    return len(ctx["students"]) * len(ctx["subjects"])
+
+
+def student_count(ctx):
+    return len(ctx["students"])
+
+
+# The serializer cases time only the serialization; rows and instances are
+# loaded beforehand. Each model serializer case has a row serializer pair
+# over the same rows, so their per-row times give the speedup directly.
+@benchmark_case("result_model_serializer", rows=result_count)
+def result_model_serializer_case(ctx):
+    results = list(Result.objects.filter(exam=ctx["exam"]).order_by("id"))
+    return lambda: ResultSerializer(results, many=True).data
+
+
+@benchmark_case("result_row_serializer", rows=result_count)
+def result_row_serializer_case(ctx):
+    rows = list(ResultRowSerializer.values(Result.objects.filter(exam=ctx["exam"]).order_by("id")))
+    return lambda: ResultRowSerializer(rows).data
+
+
+@benchmark_case("student_model_serializer", rows=student_count)
+def student_model_serializer_case(ctx):
+    return lambda: StudentSerializer(ctx["students"], many=True).data
+
+
+@benchmark_case("student_row_serializer", rows=student_count)
+def student_row_serializer_case(ctx):
+    rows = list(StudentRowSerializer.values(Student.objects.filter(class_room=ctx["class_room"]).order_by("id")))
+    return lambda: StudentRowSerializer(rows).data
+
+
+class Command(BaseCommand):
+    help = (
+        "Time result sheet, ranking, analytics, CSV import, bulk upload, serialization and PDF rendering "
+        "on seeded classes of several sizes and write the timings as JSON"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", type=int, nargs="+", default=[50, 200, 500], help="Students per class")
+        parser.add_argument("--subjects", type=int, default=8)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--case", action="append", dest="cases", choices=sorted(CASES), help="Only run these cases")
+        parser.add_argument("--output", default="benchmark-results.json", help="JSON file to write")
+        parser.add_argument("--compare", help="Earlier JSON results to compare medians against")
+
+    def handle(self, *args, **options):
+        cases = options["cases"] or list(CASES)
+        baseline = {}
+        if options["compare"]:
+            with open(options["compare"]) as previous:
+                baseline = {
+                    (entry["case"], entry["size"]): entry["median_ms"] for entry in json.load(previous)["results"]
+                }
+
+        results = []
+        for size in options["sizes"]:
+            with transaction.atomic():
+                results += self.run_size(size, options["subjects"], cases, options["repeat"])
+                transaction.set_rollback(True)
+
+        self.stdout.write(
+            f"{'case':<28}{'size':>6}{'median ms':>12}{'min ms':>10}{'us/row':>9}{'queries':>9}{'change':>9}"
+        )
+        for entry in results:
+            previous = baseline.get((entry["case"], entry["size"]))
+            change = f"{(entry['median_ms'] / previous - 1) * 100:+.0f}%" if previous else ""
+            per_row = f"{entry['per_row_us']:.2f}" if "per_row_us" in entry else ""
+            self.stdout.write(
+                f"{entry['case']:<28}{entry['size']:>6}{entry['median_ms']:>12.2f}{entry['min_ms']:>10.2f}"
+                f"{per_row:>9}{entry['queries']:>9}{change:>9}"
+            )
+
+        report = {
+            "created_at": timezone.now().isoformat(),
+            "environment": {
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "database": connection.vendor,
+                "machine": platform.machine(),
+            },
+            "options": {key: options[key] for key in ("sizes", "subjects", "repeat")},
+            "results": results,
+        }
+        with open(options["output"], "w") as output:
+            json.dump(report, output, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {len(results)} timings to {options['output']}."))
+
+    def run_size(self, size, subjects, cases, repeat):
+        # Writes made by a case are rolled back after every repetition.
+        class_rooms, exams = seed_dataset(students=size, subjects=subjects, exams=1, seed=size)
+        class_room = class_rooms[0]
+        ctx = {
+            "class_room": class_room,
+            "exam": exams[0],
+            "students": list(Student.objects.filter(class_room=class_room).order_by("id")),
+            "subjects": list(Subject.objects.filter(class_room=class_room).order_by("name")),
+        }
+        results = []
+        for name in cases:
+            func = CASES[name](ctx)
+            timings = []
+            for _ in range(repeat):
+                sql = SqlTimer()
+                with transaction.atomic(), connection.execute_wrapper(sql):
+                    started = time.perf_counter()
+                    func()
+                    timings.append((time.perf_counter() - started) * 1000)
+                    transaction.set_rollback(True)
+            results.append(
+                {
+                    "case": name,
+                    "size": size,
+                    "repeat": repeat,
+                    "median_ms": round(statistics.median(timings), 3),
+                    "mean_ms": round(statistics.mean(timings), 3),
+                    "min_ms": round(min(timings), 3),
+                    "max_ms": round(max(timings), 3),
+                    "queries": sql.count,
+                }
+            )
+            if name in ROW_COUNTS:
+                rows = ROW_COUNTS[name](ctx)
+                results[-1]["rows"] = rows
+                results[-1]["per_row_us"] = round(results[-1]["median_ms"] * 1000 / max(rows, 1), 3)
+            self.stdout.write(f"  {name} @ {size}: {results[-1]['median_ms']:.2f} ms")
+        return results
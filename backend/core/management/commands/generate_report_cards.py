@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Exam
+from core.reports import class_report_cards, render_report_cards, stream_zip
+
+
+class Command(BaseCommand):
+    help = "Render report cards for every student in an exam's class into a ZIP file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("exam_id", type=int)
+        parser.add_argument("--output", help="ZIP file to write (defaults to report_cards_exam_<id>.zip)")
+        parser.add_argument("--workers", type=int, help="Number of rendering processes")
+
+    def handle(self, *args, **options):
+        exam = Exam.objects.select_related("class_room").filter(id=options["exam_id"]).first()
+        if not exam:
+            raise CommandError(f"Exam {options['exam_id']} does not exist.")
+
+        output = options["output"] or f"report_cards_exam_{exam.id}.zip"
+        cards = class_report_cards(exam.class_room, exam)
+        with open(output, "wb") as archive:
+            for chunk in stream_zip(render_report_cards(cards, options["workers"])):
+                archive.write(chunk)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Wrote {len(cards)} report cards for '{exam}' to {output}.")
+        )
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from core.models import Exam
+from core.services import refresh_exam_summaries, refresh_subject_aggregates
+from core.snapshots import create_result_snapshot, published_snapshot
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild per-student exam summaries and per-subject exam aggregates from results, "
+        "and snapshot published exams that have no snapshot yet"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--exam", type=int, action="append", dest="exams", help="Exam id to rebuild")
+
+    def handle(self, *args, **options):
+        exams = Exam.objects.select_related("class_room").order_by("id")
+        if options["exams"]:
+            exams = exams.filter(id__in=options["exams"])
+
+        for exam in exams:
+            refresh_exam_summaries(exam.id)
+            refresh_subject_aggregates(exam.id)
+            if exam.is_published and published_snapshot(exam) is None:
+                create_result_snapshot(exam)
+            self.stdout.write(f"Rebuilt summaries for exam '{exam}' (id {exam.id})")
+
+        self.stdout.write(self.style.SUCCESS("Result summary rebuild completed."))
@@ -0,0 +1,47 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from core.jobs import claim_next_job, run_job
+
+
+class Command(BaseCommand):
+    help = "Run queued background jobs (CSV imports, report card exports) until stopped"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, help="Number of jobs to run at once")
+        parser.add_argument("--poll-interval", type=float, help="Seconds to wait when the queue is empty")
+        parser.add_argument("--once", action="store_true", help="Exit once the queue is empty")
+
+    def handle(self, *args, **options):
+        concurrency = options["concurrency"] or settings.JOB_WORKER_CONCURRENCY
+        poll_interval = options["poll_interval"] or settings.JOB_POLL_INTERVAL
+        self.stdout.write(f"Running jobs with concurrency {concurrency}.")
+        try:
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                workers = [
+                    executor.submit(self.work, poll_interval, options["once"]) for _ in range(concurrency)
+                ]
+                for worker in workers:
+                    worker.result()
+        except KeyboardInterrupt:
+            self.stdout.write("Stopping.")
+            return
+        self.stdout.write(self.style.SUCCESS("Job queue is empty."))
+
+    def work(self, poll_interval, once):
+        try:
+            while True:
+                job = claim_next_job()
+                if job is None:
+                    if once:
+                        return
+                    time.sleep(poll_interval)
+                    continue
+                job = run_job(job)
+                self.stdout.write(f"Job {job.pk} ({job.kind}) {job.status}.")
+        finally:
+            connection.close()
@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.loadgen import seed_dataset
+from core.models import Result
+
+
+class Command(BaseCommand):
+    help = "Bulk-insert synthetic classes, students, subjects, exams and results for load testing"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--classes", type=int, default=5)
+        parser.add_argument("--students", type=int, default=200, help="Students per class")
+        parser.add_argument("--subjects", type=int, default=8, help="Subjects per class")
+        parser.add_argument("--exams", type=int, default=3, help="Exams per class")
+        parser.add_argument("--seed", type=int, help="Random seed for reproducible marks and names")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        with transaction.atomic():
+            class_rooms, exams = seed_dataset(
+                classes=options["classes"],
+                students=options["students"],
+                subjects=options["subjects"],
+                exams=options["exams"],
+                seed=options["seed"],
+            )
+        results = Result.objects.filter(exam__in=exams).count()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {len(class_rooms)} classes, {len(class_rooms) * options['students']} students, "
+                f"{len(exams)} exams and {results} results in {time.perf_counter() - started:.1f}s."
+            )
+        )
@@ -17,6 +17,7 @@ class Command(BaseCommand):
             "crud_subject": "Manage subjects",
             "manage_users": "Manage users",
             "view_analytics": "View analytics",
+            "manage_grading": "Manage grading scales",
         }
         permission_objs = {}
         for code, description in permissions.items():
@@ -34,6 +35,7 @@ class Command(BaseCommand):
                 "crud_subject",
                 "manage_users",
                 "view_analytics",
+                "manage_grading",
             ],
             "Teacher": ["upload_result", "view_student_result", "view_class_result", "crud_class", "crud_subject", "publish_result"],
             "Exam Officer": [
@@ -41,6 +43,7 @@ class Command(BaseCommand):
                 "view_student_result",
                 "view_class_result",
                 "view_analytics",
+                "manage_grading",
             ],
             "Parent": ["view_student_result"],
         }
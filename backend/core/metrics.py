@@ -0,0 +1,121 @@
+import threading
+from bisect import bisect_left
+
+from .reports import report_card_cache
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values, **extra):
+    pairs = list(zip(names, values)) + list(extra.items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by a fixed tuple of label values."""
+
+    def __init__(self, name, help_text, labels, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * len(self.buckets), 0, 0]
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((labels, (list(data[0]), data[1], data[2])) for labels, data in self._series.items())
+        for label_values, (counts, total, count) in series:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_labels(self.labels, label_values, le=_number(bound))} {cumulative}")
+            lines.append(f"{self.name}_bucket{_labels(self.labels, label_values, le='+Inf')} {count}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, label_values)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labels, label_values)} {count}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = sorted(self._values.items())
+        lines += [f"{self.name}{_labels(self.labels, labels)} {_number(value)}" for labels, value in values]
+        return lines
+
+
+REQUEST_LABELS = ("view", "method")
+
+requests_total = Counter("core_requests_total", "Requests served.", ("view", "method", "status"))
+request_duration = Histogram(
+    "core_request_duration_seconds", "Wall time spent handling a request.", REQUEST_LABELS, LATENCY_BUCKETS
+)
+db_duration = Histogram(
+    "core_db_duration_seconds", "Time spent in SQL per request.", REQUEST_LABELS, LATENCY_BUCKETS
+)
+db_queries = Histogram(
+    "core_db_queries", "SQL statements executed per request.", REQUEST_LABELS, QUERY_COUNT_BUCKETS
+)
+render_duration = Histogram(
+    "core_render_duration_seconds", "Time spent rendering the response body.", REQUEST_LABELS, LATENCY_BUCKETS
+)
+
+
+def record_request(view, method, status, duration, sql_time, sql_count, render_time):
+    requests_total.inc(view, method, str(status))
+    request_duration.observe(duration, view, method)
+    db_duration.observe(sql_time, view, method)
+    db_queries.observe(sql_count, view, method)
+    if render_time is not None:
+        render_duration.observe(render_time, view, method)
+
+
+def report_card_cache_lines():
+    lines = []
+    for key, value in report_card_cache().stats().items():
+        name = f"core_report_card_cache_{key}_total"
+        lines += [f"# HELP {name} Report card cache {key} in this process.", f"# TYPE {name} counter", f"{name} {value}"]
+    return lines
+
+
+def render_metrics():
+    lines = []
+    for metric in (requests_total, request_duration, db_duration, db_queries, render_duration):
+        lines += metric.render()
+    lines += report_card_cache_lines()
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,50 @@
+import time
+
+from django.conf import settings
+from django.db import connection
+
+from .instrumentation import SqlTimer
+from .metrics import record_request
+
+
+class PerformanceMiddleware:
+    """Time each request, its SQL and its response rendering.
+
+    The numbers go into the process-wide histograms in ``core.metrics``,
+    labelled by URL name, and out to the client as a ``Server-Timing``
+    header. For streamed responses only the time to the first byte is seen.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        request._render_time = None
+        sql = SqlTimer()
+        with connection.execute_wrapper(sql):
+            response = self.get_response(request)
+        duration = time.perf_counter() - started
+
+        match = getattr(request, "resolver_match", None)
+        view = match.url_name if match and match.url_name else "unmatched"
+        record_request(view, request.method, response.status_code, duration, sql.duration, sql.count, request._render_time)
+
+        if settings.SERVER_TIMING_ENABLED:
+            app = duration - sql.duration - (request._render_time or 0)
+            metrics = [f'db;dur={sql.duration * 1000:.1f};desc="{sql.count} queries"']
+            if request._render_time is not None:
+                metrics.append(f"render;dur={request._render_time * 1000:.1f}")
+            metrics += [f"app;dur={max(app, 0) * 1000:.1f}", f"total;dur={duration * 1000:.1f}"]
+            response["Server-Timing"] = ", ".join(metrics)
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF responses render after the view returns; time that separately.
+        started = time.perf_counter()
+
+        def finished(rendered):
+            request._render_time = time.perf_counter() - started
+
+        response.add_post_render_callback(finished)
+        return response
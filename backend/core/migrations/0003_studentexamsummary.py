@@ -0,0 +1,31 @@
+# Generated by Django 4.2.30 on 2026-10-17 01:20
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_student_address_student_age_student_reg_no_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentExamSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=8)),
+                ('subject_count', models.PositiveIntegerField(default=0)),
+                ('average', models.DecimalField(blank=True, decimal_places=2, max_digits=5, null=True)),
+                ('average_grade', models.CharField(blank=True, max_length=2)),
+                ('rank', models.PositiveIntegerField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('exam', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.exam')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.student')),
+            ],
+            options={
+                'unique_together': {('student', 'exam')},
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.30 on 2026-10-17 01:27
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_studentexamsummary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubjectExamAggregate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('result_count', models.PositiveIntegerField(default=0)),
+                ('pass_count', models.PositiveIntegerField(default=0)),
+                ('total_marks', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('average', models.DecimalField(blank=True, decimal_places=2, max_digits=5, null=True)),
+                ('min_marks', models.DecimalField(blank=True, decimal_places=2, max_digits=5, null=True)),
+                ('max_marks', models.DecimalField(blank=True, decimal_places=2, max_digits=5, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('class_room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.classroom')),
+                ('exam', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.exam')),
+                ('subject', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.subject')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['class_room', 'exam'], name='core_subjec_class_r_192a61_idx')],
+                'unique_together': {('subject', 'exam')},
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.30 on 2026-10-17 01:32
+
+from django.db import migrations, models
+
+
+def seed_sequences(apps, schema_editor):
+    Student = apps.get_model("core", "Student")
+    RegistrationSequence = apps.get_model("core", "RegistrationSequence")
+    last_values = {}
+    for reg_no in Student.objects.exclude(reg_no__isnull=True).values_list("reg_no", flat=True).iterator():
+        prefix, _, value = reg_no.rpartition("/")
+        if not prefix or not value.isdigit():
+            continue
+        prefix += "/"
+        last_values[prefix] = max(last_values.get(prefix, 0), int(value))
+    RegistrationSequence.objects.bulk_create(
+        [RegistrationSequence(prefix=prefix, last_value=value) for prefix, value in last_values.items()]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_publishedresultsnapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RegistrationSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('prefix', models.CharField(max_length=20, unique=True)),
+                ('last_value', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(seed_sequences, migrations.RunPython.noop),
+    ]
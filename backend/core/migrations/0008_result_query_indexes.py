@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-17 01:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_registrationsequence'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='result',
+            index=models.Index(fields=['exam', 'student'], name='core_result_exam_id_d57c80_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='result',
+            index=models.Index(fields=['exam', 'subject'], name='core_result_exam_id_b5c822_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='resultpublication',
+            index=models.Index(fields=['exam', 'student'], name='core_result_exam_id_be5126_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['class_room', 'first_name', 'last_name'], name='core_studen_class_r_3c5898_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studentexamsummary',
+            index=models.Index(fields=['exam', 'student'], name='core_studen_exam_id_b1954e_idx'),
+        ),
+    ]
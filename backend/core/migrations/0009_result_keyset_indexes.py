@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-17 01:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_result_query_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='result',
+            name='core_result_exam_id_d57c80_idx',
+        ),
+        migrations.AddIndex(
+            model_name='result',
+            index=models.Index(fields=['exam', 'student', 'subject'], name='core_result_exam_id_d82d18_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['class_room', 'last_name', 'id'], name='core_studen_class_r_9be6bf_idx'),
+        ),
+    ]
@@ -0,0 +1,84 @@
+# Generated by Django 4.2.30 on 2026-10-17 01:48
+
+from decimal import Decimal
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# The boundaries and remarks grading was hard-coded with until now.
+STANDARD_BOUNDARIES = (
+    ("A", Decimal("81"), "KIPAWA", True),
+    ("B", Decimal("61"), "MICHIPUO", True),
+    ("C", Decimal("41"), "PASS", True),
+    ("D", Decimal("21"), "PASS", True),
+    ("F", Decimal("0"), "FAIL", False),
+)
+
+
+def seed_default_scale(apps, schema_editor):
+    GradingScale = apps.get_model("core", "GradingScale")
+    GradeBoundary = apps.get_model("core", "GradeBoundary")
+    scale = GradingScale.objects.create(name="Standard", is_default=True)
+    GradeBoundary.objects.bulk_create(
+        [
+            GradeBoundary(scale=scale, grade=grade, min_marks=min_marks, remarks=remarks, is_pass=is_pass)
+            for grade, min_marks, remarks, is_pass in STANDARD_BOUNDARIES
+        ]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_result_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GradeBoundary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('grade', models.CharField(max_length=2)),
+                ('min_marks', models.DecimalField(decimal_places=2, max_digits=5)),
+                ('remarks', models.CharField(blank=True, max_length=50)),
+                ('is_pass', models.BooleanField(default=True)),
+            ],
+            options={
+                'ordering': ['-min_marks'],
+            },
+        ),
+        migrations.CreateModel(
+            name='GradingScale',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('is_default', models.BooleanField(default=False)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='gradingscale',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_default', True)), fields=('is_default',), name='core_gradingscale_single_default'),
+        ),
+        migrations.AddField(
+            model_name='gradeboundary',
+            name='scale',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='boundaries', to='core.gradingscale'),
+        ),
+        migrations.AddField(
+            model_name='classroom',
+            name='grading_scale',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='class_rooms', to='core.gradingscale'),
+        ),
+        migrations.AddField(
+            model_name='exam',
+            name='grading_scale',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='exams', to='core.gradingscale'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='gradeboundary',
+            unique_together={('scale', 'min_marks'), ('scale', 'grade')},
+        ),
+        migrations.RunPython(seed_default_scale, migrations.RunPython.noop),
+    ]
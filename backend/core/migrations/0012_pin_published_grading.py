@@ -0,0 +1,43 @@
+# Generated by Django 4.2.30 on 2026-10-17 02:03
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def pin_published_grading(apps, schema_editor):
+    """Freeze the boundaries that already-published exams were graded with."""
+    Exam = apps.get_model("core", "Exam")
+    GradeBoundary = apps.get_model("core", "GradeBoundary")
+    GradingScale = apps.get_model("core", "GradingScale")
+    boundaries = {}
+    for scale_id, grade, min_marks, remarks, is_pass in GradeBoundary.objects.order_by("min_marks").values_list(
+        "scale_id", "grade", "min_marks", "remarks", "is_pass"
+    ):
+        boundaries.setdefault(scale_id, []).append([grade, str(min_marks), remarks, is_pass])
+    default_id = GradingScale.objects.filter(is_default=True).values_list("id", flat=True).first()
+    exams = list(Exam.objects.filter(is_published=True).select_related("class_room"))
+    for exam in exams:
+        scale_id = exam.grading_scale_id or exam.class_room.grading_scale_id or default_id
+        exam.grading_boundaries = boundaries.get(scale_id)
+    Exam.objects.bulk_update(exams, ["grading_boundaries"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_job_lease'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exam',
+            name='grading_boundaries',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='exam',
+            name='grading_scale',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='exams', to='core.gradingscale'),
+        ),
+        migrations.RunPython(pin_published_grading, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.30 on 2026-10-17 02:08
+
+import re
+
+from django.db import migrations, models
+
+TERM_ORDINALS = {"first": 1, "second": 2, "third": 3, "fourth": 4, "one": 1, "two": 2, "three": 3, "four": 4}
+
+
+def term_ordinal(term):
+    match = re.search(r"\d+", term or "")
+    if match:
+        return int(match.group())
+    for word in re.findall(r"[a-z]+", (term or "").lower()):
+        if word in TERM_ORDINALS:
+            return TERM_ORDINALS[word]
+    return 0
+
+
+def backfill_term_order(apps, schema_editor):
+    Exam = apps.get_model("core", "Exam")
+    exams = list(Exam.objects.only("id", "term"))
+    for exam in exams:
+        exam.term_order = term_ordinal(exam.term)
+    Exam.objects.bulk_update(exams, ["term_order"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_pin_published_grading'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exam',
+            name='term_order',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_term_order, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,84 @@
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db import migrations
+from django.db.models import Count, Sum
+
+# Used when no grading scale exists; matches the scale 0010 seeds.
+STANDARD_BOUNDARIES = [
+    ["F", "0", "FAIL", False],
+    ["D", "21", "PASS", True],
+    ["C", "41", "PASS", True],
+    ["B", "61", "MICHIPUO", True],
+    ["A", "81", "KIPAWA", True],
+]
+
+
+def grade_for(boundaries, marks):
+    grade = boundaries[0][0]
+    for boundary_grade, min_marks, _, _ in boundaries:
+        if marks >= Decimal(min_marks):
+            grade = boundary_grade
+    return grade
+
+
+def backfill_exam_summaries(apps, schema_editor):
+    """Build summaries for exams that have results but no summaries yet.
+
+    Sheets and report cards read totals and ranks only from summaries, so
+    without this they show blanks until ``rebuild_result_summaries`` runs.
+    """
+    Exam = apps.get_model("core", "Exam")
+    Result = apps.get_model("core", "Result")
+    StudentExamSummary = apps.get_model("core", "StudentExamSummary")
+    GradeBoundary = apps.get_model("core", "GradeBoundary")
+    GradingScale = apps.get_model("core", "GradingScale")
+
+    scales = {}
+    for scale_id, grade, min_marks, remarks, is_pass in GradeBoundary.objects.order_by("min_marks").values_list(
+        "scale_id", "grade", "min_marks", "remarks", "is_pass"
+    ):
+        scales.setdefault(scale_id, []).append([grade, str(min_marks), remarks, is_pass])
+    default_id = GradingScale.objects.filter(is_default=True).values_list("id", flat=True).first()
+    summarised = set(StudentExamSummary.objects.values_list("exam_id", flat=True).distinct())
+
+    for exam in Exam.objects.select_related("class_room").exclude(id__in=summarised).iterator():
+        if exam.is_published and exam.grading_boundaries:
+            boundaries = sorted(exam.grading_boundaries, key=lambda boundary: Decimal(boundary[1]))
+        else:
+            scale_id = exam.grading_scale_id or exam.class_room.grading_scale_id or default_id
+            boundaries = scales.get(scale_id, STANDARD_BOUNDARIES)
+        entries = (
+            Result.objects.filter(exam=exam, student__class_room_id=exam.class_room_id)
+            .values("student_id")
+            .annotate(total=Sum("marks"), subject_count=Count("id"))
+            .order_by("-total")
+        )
+        rows = []
+        rank, previous = 0, None
+        for position, entry in enumerate(entries, start=1):
+            if entry["total"] != previous:
+                rank, previous = position, entry["total"]
+            average = entry["total"] / entry["subject_count"]
+            rows.append(
+                StudentExamSummary(
+                    student_id=entry["student_id"],
+                    exam_id=exam.id,
+                    total=entry["total"],
+                    subject_count=entry["subject_count"],
+                    average=average.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP),
+                    average_grade=grade_for(boundaries, average),
+                    rank=rank,
+                )
+            )
+        StudentExamSummary.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_exam_term_order'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_exam_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,86 @@
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db import migrations
+from django.db.models import Count, Max, Min, Q, Sum
+
+# Used when no grading scale exists; matches the scale 0010 seeds.
+STANDARD_BOUNDARIES = [
+    ["F", "0", "FAIL", False],
+    ["D", "21", "PASS", True],
+    ["C", "41", "PASS", True],
+    ["B", "61", "MICHIPUO", True],
+    ["A", "81", "KIPAWA", True],
+]
+
+
+def pass_mark_for(boundaries):
+    passing = [Decimal(min_marks) for _, min_marks, _, is_pass in boundaries if is_pass]
+    return min(passing) if passing else None
+
+
+def backfill_subject_aggregates(apps, schema_editor):
+    """Build per-subject aggregates for exams that have results but none yet.
+
+    Trends and extended analytics read subject figures only from
+    aggregates, so without this they come back empty for every existing
+    exam until ``rebuild_result_summaries`` runs.
+    """
+    Exam = apps.get_model("core", "Exam")
+    Result = apps.get_model("core", "Result")
+    SubjectExamAggregate = apps.get_model("core", "SubjectExamAggregate")
+    GradeBoundary = apps.get_model("core", "GradeBoundary")
+    GradingScale = apps.get_model("core", "GradingScale")
+
+    scales = {}
+    for scale_id, grade, min_marks, remarks, is_pass in GradeBoundary.objects.values_list(
+        "scale_id", "grade", "min_marks", "remarks", "is_pass"
+    ):
+        scales.setdefault(scale_id, []).append([grade, str(min_marks), remarks, is_pass])
+    default_id = GradingScale.objects.filter(is_default=True).values_list("id", flat=True).first()
+    aggregated = set(SubjectExamAggregate.objects.values_list("exam_id", flat=True).distinct())
+
+    for exam in Exam.objects.select_related("class_room").exclude(id__in=aggregated).iterator():
+        if exam.is_published and exam.grading_boundaries:
+            boundaries = exam.grading_boundaries
+        else:
+            scale_id = exam.grading_scale_id or exam.class_room.grading_scale_id or default_id
+            boundaries = scales.get(scale_id, STANDARD_BOUNDARIES)
+        pass_mark = pass_mark_for(boundaries)
+        passed = Q(marks__gte=pass_mark) if pass_mark is not None else Q(pk__in=[])
+        entries = (
+            Result.objects.filter(exam=exam, student__class_room_id=exam.class_room_id)
+            .values("subject_id")
+            .annotate(
+                result_count=Count("id"),
+                pass_count=Count("id", filter=passed),
+                total_marks=Sum("marks"),
+                min_marks=Min("marks"),
+                max_marks=Max("marks"),
+            )
+            .order_by("subject_id")
+        )
+        SubjectExamAggregate.objects.bulk_create(
+            [
+                SubjectExamAggregate(
+                    class_room_id=exam.class_room_id,
+                    exam_id=exam.id,
+                    average=(entry["total_marks"] / entry["result_count"]).quantize(
+                        Decimal("0.01"), rounding=ROUND_HALF_UP
+                    ),
+                    **entry,
+                )
+                for entry in entries
+            ],
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_backfill_exam_summaries'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_subject_aggregates, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,7 @@
+import re
+
 from django.conf import settings
-from django.db import IntegrityError, models, transaction
+from django.db import IntegrityError, connection, models
 from django.utils import timezone
 
 
@@ -34,16 +36,91 @@ class UserRole(models.Model):
         unique_together = ("user", "role")
 
 
+class GradingScale(models.Model):
+    """Grade boundaries and remarks, assignable to a class or a single exam.
+
+    An exam is graded on its own scale, else its class's, else the default.
+    """
+
+    name = models.CharField(max_length=100, unique=True)
+    is_default = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["is_default"],
+                condition=models.Q(is_default=True),
+                name="core_gradingscale_single_default",
+            )
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+class GradeBoundary(models.Model):
+    """The lowest mark that earns ``grade`` on a scale."""
+
+    scale = models.ForeignKey(GradingScale, on_delete=models.CASCADE, related_name="boundaries")
+    grade = models.CharField(max_length=2)
+    min_marks = models.DecimalField(max_digits=5, decimal_places=2)
+    remarks = models.CharField(max_length=50, blank=True)
+    is_pass = models.BooleanField(default=True)
+
+    class Meta:
+        ordering = ["-min_marks"]
+        unique_together = [("scale", "grade"), ("scale", "min_marks")]
+
+    def __str__(self):
+        return f"{self.scale} {self.grade} >= {self.min_marks}"
+
+
 class ClassRoom(models.Model):
     name = models.CharField(max_length=100, unique=True)
     class_teacher = models.ForeignKey(
         settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True
     )
+    grading_scale = models.ForeignKey(
+        GradingScale, on_delete=models.SET_NULL, null=True, blank=True, related_name="class_rooms"
+    )
 
     def __str__(self):
         return self.name
 
 
+class RegistrationSequence(models.Model):
+    prefix = models.CharField(max_length=20, unique=True)
+    last_value = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.prefix}{self.last_value:03d}"
+
+    @classmethod
+    def reserve(cls, prefix, count=1):
+        """Advance the prefix's counter by ``count`` and return the reserved values.
+
+        A single upsert both creates a missing counter and bumps an existing
+        one; the row lock it takes serializes concurrent enrolments without
+        scans or retries.
+        """
+        table = connection.ops.quote_name(cls._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} (prefix, last_value) VALUES (%s, %s) "
+                f"ON CONFLICT (prefix) DO UPDATE SET last_value = {table}.last_value + EXCLUDED.last_value "
+                "RETURNING last_value",
+                [prefix, count],
+            )
+            last_value = cursor.fetchone()[0]
+        return range(last_value - count + 1, last_value + 1)
+
+    @classmethod
+    def advance_to(cls, prefix, value):
+        """Move the prefix's counter up to ``value`` unless it is already past it."""
+        cls.objects.filter(prefix=prefix, last_value__lt=value).update(last_value=value)
+
+
 class Student(models.Model):
     GENDER_CHOICES = (("M", "Male"), ("F", "Female"))
 
@@ -59,6 +136,14 @@ class Student(models.Model):
     )
     address = models.CharField(max_length=255, null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["class_room", "first_name", "last_name"]),
+            models.Index(fields=["class_room", "last_name", "id"]),
+        ]
+
+    REG_NO_ATTEMPTS = 3
+
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
 
@@ -69,32 +154,40 @@ class Student(models.Model):
         return f"{prefix}/{year_suffix:02d}/"
 
     @classmethod
-    def _next_reg_no(cls):
-        prefix = cls._reg_no_prefix()
-        last_student = (
-            cls.objects.filter(reg_no__startswith=prefix).order_by("-reg_no").first()
+    def _highest_reg_no_value(cls, prefix):
+        reg_nos = cls.objects.filter(reg_no__startswith=prefix).values_list("reg_no", flat=True)
+        suffixes = (reg_no[len(prefix):] for reg_no in reg_nos)
+        return max((int(suffix) for suffix in suffixes if suffix.isdigit()), default=0)
+
+    @classmethod
+    def _any_reg_no_taken(cls, reg_nos, batch_size=1000):
+        return any(
+            cls.objects.filter(reg_no__in=reg_nos[start:start + batch_size]).exists()
+            for start in range(0, len(reg_nos), batch_size)
         )
-        if not last_student or not last_student.reg_no:
-            next_seq = 1
-        else:
-            try:
-                next_seq = int(last_student.reg_no.split("/")[-1]) + 1
-            except (ValueError, IndexError):
-                next_seq = 1
-        return f"{prefix}{next_seq:03d}"
+
+    @classmethod
+    def reserve_reg_nos(cls, count):
+        """Reserve ``count`` consecutive registration numbers for this year's prefix.
+
+        A number can already be taken when it was typed in by hand ahead of
+        the counter. The counter is then moved past the highest number in
+        use and the block is reserved again, up to ``REG_NO_ATTEMPTS`` times.
+        Blocks given up on a retry are never handed out again, so each retry
+        leaves a gap in the numbering.
+        """
+        prefix = cls._reg_no_prefix()
+        for _ in range(cls.REG_NO_ATTEMPTS):
+            reg_nos = [f"{prefix}{value:03d}" for value in RegistrationSequence.reserve(prefix, count)]
+            if not cls._any_reg_no_taken(reg_nos):
+                return reg_nos
+            RegistrationSequence.advance_to(prefix, cls._highest_reg_no_value(prefix))
+        raise IntegrityError("Unable to reserve unused registration numbers.")
 
     def save(self, *args, **kwargs):
-        if self.reg_no:
-            return super().save(*args, **kwargs)
-        for _ in range(5):
-            try:
-                with transaction.atomic():
-                    self.reg_no = self._next_reg_no()
-                    return super().save(*args, **kwargs)
-            except IntegrityError:
-                self.reg_no = None
-                continue
-        raise IntegrityError("Unable to generate unique registration number.")
+        if not self.reg_no:
+            self.reg_no = self.reserve_reg_nos(1)[0]
+        return super().save(*args, **kwargs)
 
 
 class Subject(models.Model):
@@ -112,9 +205,25 @@ class Subject(models.Model):
         return f"{self.name} ({self.code})"
 
 
+TERM_ORDINALS = {"first": 1, "second": 2, "third": 3, "fourth": 4, "one": 1, "two": 2, "three": 3, "four": 4}
+
+
+def term_ordinal(term):
+    """Position of a term within its year read from its label ("Term 2", "Second term"); 0 if none."""
+    match = re.search(r"\d+", term or "")
+    if match:
+        return int(match.group())
+    for word in re.findall(r"[a-z]+", (term or "").lower()):
+        if word in TERM_ORDINALS:
+            return TERM_ORDINALS[word]
+    return 0
+
+
 class Exam(models.Model):
     name = models.CharField(max_length=100)
     term = models.CharField(max_length=50)
+    # Orders exams within a year; term labels do not sort ("Term 10" < "Term 2").
+    term_order = models.PositiveSmallIntegerField(default=0)
     year = models.IntegerField()
     class_room = models.ForeignKey(ClassRoom, on_delete=models.CASCADE)
     is_published = models.BooleanField(default=False)
@@ -122,12 +231,24 @@ class Exam(models.Model):
         settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True
     )
     published_at = models.DateTimeField(null=True, blank=True)
+    grading_scale = models.ForeignKey(
+        GradingScale, on_delete=models.PROTECT, null=True, blank=True, related_name="exams"
+    )
+    # The boundaries the exam was graded with, frozen at publish so later
+    # scale edits cannot change its remarks or pass counts.
+    grading_boundaries = models.JSONField(null=True, blank=True)
 
-    def publish(self, user):
+    def save(self, *args, **kwargs):
+        if not self.term_order:
+            self.term_order = term_ordinal(self.term)
+        super().save(*args, **kwargs)
+
+    def publish(self, user, grading_boundaries=None):
         self.is_published = True
-        self.published_by = user
+        self.published_by_id = user.id
         self.published_at = timezone.now()
-        self.save(update_fields=["is_published", "published_by", "published_at"])
+        self.grading_boundaries = grading_boundaries
+        self.save(update_fields=["is_published", "published_by", "published_at", "grading_boundaries"])
 
     def __str__(self):
         return f"{self.name} {self.term} {self.year}"
@@ -147,6 +268,10 @@ class Result(models.Model):
 
     class Meta:
         unique_together = ("student", "subject", "exam")
+        indexes = [
+            models.Index(fields=["exam", "student", "subject"]),
+            models.Index(fields=["exam", "subject"]),
+        ]
 
     def __str__(self):
         return f"{self.student} - {self.subject} - {self.exam}"
@@ -162,8 +287,111 @@ class ResultPublication(models.Model):
 
     class Meta:
         unique_together = ("student", "exam")
+        indexes = [models.Index(fields=["exam", "student"])]
 
     def publish(self, user):
-        self.published_by = user
+        self.published_by_id = user.id
         self.published_at = timezone.now()
         self.save(update_fields=["published_by", "published_at"])
+
+
+class StudentExamSummary(models.Model):
+    student = models.ForeignKey(Student, on_delete=models.CASCADE)
+    exam = models.ForeignKey(Exam, on_delete=models.CASCADE)
+    total = models.DecimalField(max_digits=8, decimal_places=2, default=0)
+    subject_count = models.PositiveIntegerField(default=0)
+    average = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)
+    average_grade = models.CharField(max_length=2, blank=True)
+    rank = models.PositiveIntegerField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("student", "exam")
+        indexes = [models.Index(fields=["exam", "student"])]
+
+    def __str__(self):
+        return f"{self.student} - {self.exam}"
+
+
+class SubjectExamAggregate(models.Model):
+    class_room = models.ForeignKey(ClassRoom, on_delete=models.CASCADE)
+    subject = models.ForeignKey(Subject, on_delete=models.CASCADE)
+    exam = models.ForeignKey(Exam, on_delete=models.CASCADE)
+    result_count = models.PositiveIntegerField(default=0)
+    pass_count = models.PositiveIntegerField(default=0)
+    total_marks = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    average = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)
+    min_marks = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)
+    max_marks = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("subject", "exam")
+        indexes = [models.Index(fields=["class_room", "exam"])]
+
+    def __str__(self):
+        return f"{self.subject} - {self.exam}"
+
+
+class PublishedResultSnapshot(models.Model):
+    exam = models.OneToOneField(
+        Exam, on_delete=models.CASCADE, primary_key=True, related_name="result_snapshot"
+    )
+    published_at = models.DateTimeField(null=True, blank=True)
+    data = models.BinaryField()
+    created_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Snapshot of {self.exam}"
+
+
+class Job(models.Model):
+    STATUS_QUEUED = "queued"
+    STATUS_RUNNING = "running"
+    STATUS_SUCCEEDED = "succeeded"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = (
+        (STATUS_QUEUED, "Queued"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_SUCCEEDED, "Succeeded"),
+        (STATUS_FAILED, "Failed"),
+    )
+
+    kind = models.CharField(max_length=50)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    payload = models.JSONField(default=dict, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    progress = models.PositiveIntegerField(default=0)
+    progress_total = models.PositiveIntegerField(default=0)
+    input_file = models.FileField(upload_to="jobs/input/", null=True, blank=True)
+    output_file = models.FileField(upload_to="jobs/output/", null=True, blank=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "created_at"])]
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.status})"
+
+    @property
+    def is_finished(self):
+        return self.status in (self.STATUS_SUCCEEDED, self.STATUS_FAILED)
+
+    def set_progress(self, progress, total=None):
+        self.progress = progress
+        update = {"progress": progress}
+        if total is not None:
+            self.progress_total = total
+            update["progress_total"] = total
+        Job.objects.filter(pk=self.pk).update(**update)
+
+    def heartbeat(self):
+        Job.objects.filter(pk=self.pk, status=self.STATUS_RUNNING).update(heartbeat_at=timezone.now())
@@ -1,6 +1,133 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import json
+from functools import partial
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 
 class StandardResultsSetPagination(PageNumberPagination):
     page_size_query_param = "page_size"
     max_page_size = 100
+
+
+class KeysetPagination(BasePagination):
+    """Forward-only cursor pagination over a unique, indexed ordering.
+
+    The cursor carries the last row's value for every ordering field, and the
+    next page is fetched with a seek condition instead of an ``OFFSET``, so
+    deep pages cost the same as the first and no ``COUNT(*)`` is run.
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    invalid_cursor_message = "Invalid cursor."
+
+    def __init__(self, ordering, page_size):
+        self.ordering = tuple(ordering)
+        self.page_size = page_size
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def encode_cursor(self, values):
+        return base64.urlsafe_b64encode(json.dumps(values, cls=DjangoJSONEncoder).encode("utf-8")).decode("ascii")
+
+    def decode_cursor(self, request):
+        raw = request.query_params.get(self.cursor_query_param)
+        if not raw:
+            return None
+        try:
+            values = json.loads(base64.urlsafe_b64decode(raw.encode("ascii")))
+        except (ValueError, TypeError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return values
+
+    def resolve_fields(self, model):
+        """``(attname, descending)`` per ordering entry, so foreign keys compare by id."""
+        return [
+            (model._meta.get_field(name.lstrip("-")).attname, name.startswith("-")) for name in self.ordering
+        ]
+
+    def seek_condition(self, fields, values):
+        """Rows strictly after ``values`` in the ordering, as a ``Q``.
+
+        Expands the row comparison ``(a, b, c) > (x, y, z)`` field by field
+        and adds ``a >= x`` so the planner can range-scan the leading column.
+        """
+        condition = Q()
+        equal = {}
+        for (attname, descending), value in zip(fields, values):
+            condition |= Q(**equal, **{f"{attname}__{'lt' if descending else 'gt'}": value})
+            equal[attname] = value
+        leading, descending = fields[0]
+        return Q(**{f"{leading}__{'lte' if descending else 'gte'}": values[0]}) & condition
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        fields = self.resolve_fields(queryset.model)
+        queryset = queryset.order_by(*(f"-{attname}" if descending else attname for attname, descending in fields))
+        values = self.decode_cursor(request)
+        if values is not None:
+            queryset = queryset.filter(self.seek_condition(fields, values))
+
+        rows = list(queryset[: page_size + 1])
+        self.has_next = len(rows) > page_size
+        rows = rows[:page_size]
+        self.next_values = None
+        if self.has_next:
+            last = rows[-1]
+            # Rows are model instances, or dicts when the view lists ``values()``.
+            get = last.__getitem__ if isinstance(last, dict) else partial(getattr, last)
+            self.next_values = [get(attname) for attname, _ in fields]
+        return rows
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_values))
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {"next": {"type": "string", "nullable": True}, "results": schema},
+        }
+
+
+class KeysetPaginationMixin:
+    """Switch a list view to ``KeysetPagination`` on ``?cursor=`` or ``?pagination=cursor``.
+
+    ``keyset_ordering`` must be unique and backed by an index; it replaces
+    any ``?ordering=`` in cursor mode. Views with ``keyset_default`` always
+    paginate by cursor.
+    """
+
+    keyset_ordering = ("id",)
+    keyset_default = False
+
+    @property
+    def paginator(self):
+        if not hasattr(self, "_paginator"):
+            params = self.request.query_params
+            if self.keyset_default or "cursor" in params or params.get("pagination") == "cursor":
+                page_size = getattr(self.pagination_class, "page_size", None)
+                self._paginator = KeysetPagination(self.keyset_ordering, page_size or 20)
+            else:
+                return super().paginator
+        return self._paginator
@@ -1,17 +1,66 @@
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import cache
 from rest_framework.permissions import BasePermission
+
+from .caching import bump_version, get_version
 from .models import Permission, RolePermission, UserRole
 
+PERMISSION_VERSION_KEY = "core:permissions:version"
 
-def get_user_permission_codes(user):
-    if not user or not user.is_authenticated:
-        return set()
-    if user.is_superuser:
-        return set(Permission.objects.values_list("code", flat=True))
-    role_ids = UserRole.objects.filter(user=user).values_list("role_id", flat=True)
+
+def permission_version(refresh=False):
+    return get_version(PERMISSION_VERSION_KEY, refresh=refresh)
+
+
+def bump_permission_version():
+    """Invalidate every cached permission set at once."""
+    bump_version(PERMISSION_VERSION_KEY)
+
+
+def _load_user_permission_codes(user_id, is_superuser):
+    if is_superuser:
+        return frozenset(Permission.objects.values_list("code", flat=True))
+    role_ids = UserRole.objects.filter(user_id=user_id).values_list("role_id", flat=True)
     permission_codes = RolePermission.objects.filter(role_id__in=role_ids).values_list(
         "permission__code", flat=True
     )
-    return set(permission_codes)
+    return frozenset(permission_codes)
+
+
+@lru_cache(maxsize=1024)
+def _shared_permission_codes(version, user_id, is_superuser):
+    # The version is part of the key, so a bump retires every entry here and
+    # in the shared cache at once.
+    cache_key = f"core:permissions:{version}:{user_id}:{int(is_superuser)}"
+    codes = cache.get(cache_key)
+    if codes is None:
+        codes = _load_user_permission_codes(user_id, is_superuser)
+        cache.set(cache_key, codes, settings.PERMISSION_CACHE_TIMEOUT)
+    return codes
+
+
+def clear_local_permission_codes():
+    _shared_permission_codes.cache_clear()
+
+
+def get_user_permission_codes(user):
+    """Return the user's permission codes.
+
+    The set is memoized on the user object for the rest of the request, per
+    process and in the cache framework, keyed on a version that the signals
+    in ``core.signals`` bump whenever roles change. A warm check runs no
+    queries.
+    """
+    if not user or not user.is_authenticated:
+        return frozenset()
+    codes = getattr(user, "_permission_codes_cache", None)
+    if codes is not None:
+        return codes
+    codes = _shared_permission_codes(permission_version(), user.pk, bool(user.is_superuser))
+    user._permission_codes_cache = codes
+    return codes
 
 
 class HasPermission(BasePermission):
@@ -0,0 +1,308 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+from io import BytesIO
+
+from django.conf import settings
+from django.db.models import Count, Max
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+
+from .models import Result, Student, StudentExamSummary
+from .grading import scale_for_exam
+
+
+def report_card_filename(student):
+    identifier = (student.reg_no or str(student.id)).replace("/", "-")
+    return f"report_card_{identifier}_{student.first_name}_{student.last_name}.pdf".replace(" ", "_")
+
+
+def report_card_data(student, exam, results, summary, scale=None):
+    """Collect everything a report card shows into a plain, picklable dict."""
+    average_grade = summary.average_grade if summary else ""
+    scale = scale or scale_for_exam(exam)
+    return {
+        "filename": report_card_filename(student),
+        "school": settings.TUITION_NAME,
+        "exam": f"{exam.name} {exam.term} {exam.year}",
+        "student": f"{student.first_name} {student.last_name}",
+        "class_room": student.class_room.name,
+        "results": [(result.subject.name, str(result.marks), result.grade) for result in results],
+        "total": str(summary.total if summary else Decimal("0")),
+        "average": f"{summary.average if summary else Decimal('0'):.2f}",
+        "average_grade": average_grade,
+        "remarks": scale.remarks_for(average_grade) if average_grade else "",
+        "rank": summary.rank if summary and summary.rank else "N/A",
+    }
+
+
+def render_report_card(card):
+    buffer = BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=letter)
+    pdf.setFont("Helvetica-Bold", 16)
+    pdf.drawString(40, 750, card["school"])
+    pdf.setFont("Helvetica", 12)
+    pdf.drawString(40, 730, f"Report Card: {card['exam']}")
+    pdf.drawString(40, 710, f"Student: {card['student']}")
+    pdf.drawString(40, 690, f"Class: {card['class_room']}")
+
+    y = 660
+    pdf.drawString(40, y, "Subject")
+    pdf.drawString(250, y, "Marks")
+    pdf.drawString(320, y, "Grade")
+    y -= 20
+    for subject_name, marks, grade in card["results"]:
+        pdf.drawString(40, y, subject_name)
+        pdf.drawString(250, y, marks)
+        pdf.drawString(320, y, grade)
+        y -= 20
+        if y < 120:
+            pdf.showPage()
+            y = 750
+
+    pdf.drawString(40, y - 20, f"Total: {card['total']}")
+    pdf.drawString(40, y - 40, f"Average: {card['average']}")
+    pdf.drawString(40, y - 60, f"Avg Grade: {card['average_grade']}")
+    pdf.drawString(40, y - 80, f"Remarks: {card['remarks']}")
+    pdf.drawString(40, y - 100, f"Rank: {card['rank']}")
+
+    pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+
+def class_report_cards(class_room, exam):
+    """Build report card data for every student in a class with three queries."""
+    return list(class_report_cards_by_student(class_room, exam).values())
+
+
+def class_report_cards_by_student(class_room, exam):
+    """Report card data for a class keyed by student id, in name order."""
+    students = Student.objects.filter(class_room=class_room).select_related("class_room")
+    results_by_student = {}
+    results = (
+        Result.objects.filter(exam=exam, student__class_room=class_room)
+        .select_related("subject")
+        .order_by("student_id", "id")
+    )
+    for result in results:
+        results_by_student.setdefault(result.student_id, []).append(result)
+    summaries = {
+        summary.student_id: summary
+        for summary in StudentExamSummary.objects.filter(exam=exam, student__class_room=class_room)
+    }
+    scale = scale_for_exam(exam)
+    return {
+        student.id: report_card_data(
+            student, exam, results_by_student.get(student.id, []), summaries.get(student.id), scale
+        )
+        for student in students.order_by("first_name", "last_name")
+    }
+
+
+def render_report_cards(cards, workers=None):
+    """Yield ``(filename, pdf_bytes)`` in order, rendering across a process pool.
+
+    At most ``2 * workers`` cards are in flight, so memory stays bounded no
+    matter how large the class is.
+    """
+    workers = workers or settings.REPORT_CARD_WORKERS
+    if workers <= 1:
+        for card in cards:
+            yield card["filename"], render_report_card(card)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for card in cards:
+            pending.append((card["filename"], executor.submit(render_report_card, card)))
+            if len(pending) >= workers * 2:
+                filename, future = pending.popleft()
+                yield filename, future.result()
+        while pending:
+            filename, future = pending.popleft()
+            yield filename, future.result()
+
+
+class _ZipStream:
+    """Write-only file object that hands buffered bytes back on ``drain``."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_zip(files):
+    """Yield a ZIP archive of ``(filename, bytes)`` pairs one member at a time."""
+    stream = _ZipStream()
+    with zipfile.ZipFile(stream, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for filename, content in files:
+            archive.writestr(filename, content)
+            yield stream.drain()
+    yield stream.drain()
+
+
+class ReportCardCache:
+    """Size-bounded on-disk cache of rendered report cards with LRU eviction.
+
+    Entries are content addressed by a hash of everything that shows up on
+    the card, so stale files are never served; they simply age out. Hits
+    refresh the file's mtime, which eviction uses as the recency order.
+
+    Writes add to a running size estimate instead of scanning the directory.
+    The directory is only walked when the estimate passes ``max_bytes``, or
+    every ``RESCAN_INTERVAL`` seconds to count files written by other
+    processes. Eviction trims to ``LOW_WATERMARK`` of the limit, so the
+    writes that follow do not each trigger another walk.
+    """
+
+    RESCAN_INTERVAL = 60.0
+    LOW_WATERMARK = 0.9
+
+    def __init__(self, directory, max_bytes):
+        self.directory = str(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size = None
+        self._scanned_at = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.pdf")
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "rb") as cached:
+                data = cached.read()
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return data
+
+    def set(self, key, data):
+        if not self.enabled:
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as tmp:
+            tmp.write(data)
+        try:
+            replaced = os.stat(path).st_size
+        except FileNotFoundError:
+            replaced = 0
+        os.replace(tmp_path, path)
+        with self._lock:
+            rescan = self._size is None or time.monotonic() - self._scanned_at >= self.RESCAN_INTERVAL
+            if not rescan:
+                self._size += len(data) - replaced
+                rescan = self._size > self.max_bytes
+        if rescan:
+            self.evict()
+
+    def evict(self):
+        """Walk the directory and drop least recently used files until it fits."""
+        entries = []
+        total = 0
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith(".pdf"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+        if total > self.max_bytes:
+            target = self.max_bytes * self.LOW_WATERMARK
+            entries.sort()
+            for _, size, path in entries:
+                if total <= target:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                with self._lock:
+                    self.evictions += 1
+        with self._lock:
+            self._size = total
+            self._scanned_at = time.monotonic()
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+
+_report_card_cache = None
+
+
+def report_card_cache():
+    global _report_card_cache
+    if _report_card_cache is None:
+        _report_card_cache = ReportCardCache(
+            settings.REPORT_CARD_CACHE_DIR, settings.REPORT_CARD_CACHE_MAX_BYTES
+        )
+    return _report_card_cache
+
+
+def report_card_cache_key(student, exam):
+    """Fingerprint every input of a student's report card.
+
+    Totals and ranks depend on the whole class, so unpublished exams are
+    keyed on the class's latest result change. A published exam is locked,
+    so its publish time alone identifies the data and no query is needed.
+    """
+    parts = [
+        settings.TUITION_NAME,
+        student.id,
+        student.first_name,
+        student.last_name,
+        student.class_room_id,
+        student.class_room.name,
+        exam.id,
+        exam.name,
+        exam.term,
+        exam.year,
+        exam.published_at.isoformat() if exam.is_published and exam.published_at else None,
+    ]
+    if not exam.is_published:
+        state = Result.objects.filter(exam=exam, student__class_room_id=student.class_room_id).aggregate(
+            last_updated=Max("updated_at"), count=Count("id")
+        )
+        last_updated = state["last_updated"]
+        parts += [last_updated.isoformat() if last_updated else None, state["count"]]
+    return hashlib.sha256(json.dumps(parts).encode("utf-8")).hexdigest()
@@ -1,9 +1,15 @@
 from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
 from rest_framework import serializers
 
+from .caching import bump_grading_version
 from .models import (
     ClassRoom,
     Exam,
+    GradeBoundary,
+    GradingScale,
+    Job,
     Permission,
     Result,
     Role,
@@ -11,8 +17,10 @@ from .models import (
     Student,
     Subject,
     UserRole,
+    term_ordinal,
 )
-from .services import grade_for_marks, is_result_published
+from .grading import grade_for_marks, scale_for_exam
+from .services import is_result_published, on_results_changed
 from .permissions import get_user_permission_codes
 
 User = get_user_model()
@@ -60,7 +68,17 @@ class UserSerializer(serializers.ModelSerializer):
 class ClassRoomSerializer(serializers.ModelSerializer):
     class Meta:
         model = ClassRoom
-        fields = ["id", "name", "class_teacher"]
+        fields = ["id", "name", "class_teacher", "grading_scale"]
+
+
+def split_full_name(attrs):
+    """Fill first and last name from ``full_name`` when neither was given."""
+    full_name = attrs.pop("full_name", None)
+    if full_name and not attrs.get("first_name") and not attrs.get("last_name"):
+        parts = [part for part in full_name.strip().split(" ") if part]
+        if parts:
+            attrs["first_name"] = parts[0]
+            attrs["last_name"] = " ".join(parts[1:]) if len(parts) > 1 else ""
 
 
 class StudentSerializer(serializers.ModelSerializer):
@@ -93,12 +111,7 @@ class StudentSerializer(serializers.ModelSerializer):
         return f"{obj.first_name} {obj.last_name}".strip()
 
     def validate(self, attrs):
-        full_name = attrs.pop("full_name", None)
-        if full_name and not attrs.get("first_name") and not attrs.get("last_name"):
-            parts = [part for part in full_name.strip().split(" ") if part]
-            if parts:
-                attrs["first_name"] = parts[0]
-                attrs["last_name"] = " ".join(parts[1:]) if len(parts) > 1 else ""
+        split_full_name(attrs)
         if not attrs.get("first_name"):
             if self.instance and getattr(self, "partial", False):
                 return attrs
@@ -106,6 +119,26 @@ class StudentSerializer(serializers.ModelSerializer):
         return attrs
 
 
+class StudentEnrolmentSerializer(serializers.Serializer):
+    """One row of a bulk enrolment; the class is an id or name resolved later."""
+
+    first_name = serializers.CharField(max_length=100, required=False)
+    last_name = serializers.CharField(max_length=100, required=False, allow_blank=True)
+    full_name = serializers.CharField(required=False)
+    gender = serializers.ChoiceField(choices=Student.GENDER_CHOICES)
+    age = serializers.IntegerField(min_value=0, max_value=32767, required=False, allow_null=True)
+    date_of_birth = serializers.DateField(required=False, allow_null=True)
+    class_room = serializers.CharField(max_length=100)
+    parent = serializers.IntegerField(required=False, allow_null=True)
+    address = serializers.CharField(max_length=255, required=False, allow_blank=True, allow_null=True)
+
+    def validate(self, attrs):
+        split_full_name(attrs)
+        if not attrs.get("first_name"):
+            raise serializers.ValidationError("first_name is required.")
+        return attrs
+
+
 class SubjectSerializer(serializers.ModelSerializer):
     class Meta:
         model = Subject
@@ -119,17 +152,86 @@ class ExamSerializer(serializers.ModelSerializer):
             "id",
             "name",
             "term",
+            "term_order",
             "year",
             "class_room",
             "is_published",
             "published_by",
             "published_at",
+            "grading_scale",
         ]
         read_only_fields = ["is_published", "published_by", "published_at"]
 
+    def validate(self, attrs):
+        if "term" in attrs and not attrs.get("term_order"):
+            attrs["term_order"] = term_ordinal(attrs["term"])
+        return attrs
+
+    def validate_grading_scale(self, value):
+        if self.instance and self.instance.is_published and value != self.instance.grading_scale:
+            raise serializers.ValidationError("Cannot change the grading scale after the exam is published.")
+        return value
+
+
+class GradeBoundarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = GradeBoundary
+        fields = ["grade", "min_marks", "remarks", "is_pass"]
+
+
+class GradingScaleSerializer(serializers.ModelSerializer):
+    boundaries = GradeBoundarySerializer(many=True)
+
+    class Meta:
+        model = GradingScale
+        fields = ["id", "name", "is_default", "boundaries", "updated_at"]
+        read_only_fields = ["updated_at"]
+        # Saving a new default clears the old one, so the single-default
+        # constraint must not reject the request up front.
+        extra_kwargs = {"is_default": {"validators": []}}
+
+    def validate_boundaries(self, boundaries):
+        if not boundaries:
+            raise serializers.ValidationError("A grading scale needs at least one boundary.")
+        if len({boundary["grade"] for boundary in boundaries}) != len(boundaries):
+            raise serializers.ValidationError("Grades must be unique.")
+        if len({boundary["min_marks"] for boundary in boundaries}) != len(boundaries):
+            raise serializers.ValidationError("Minimum marks must be unique.")
+        ordered = sorted(boundaries, key=lambda boundary: boundary["min_marks"])
+        passing = [boundary.get("is_pass", True) for boundary in ordered]
+        if True not in passing:
+            raise serializers.ValidationError("At least one grade must be a pass.")
+        if not all(passing[passing.index(True):]):
+            raise serializers.ValidationError("Pass grades must all be above the fail grades.")
+        return boundaries
+
+    def _replace_boundaries(self, scale, boundaries):
+        scale.boundaries.all().delete()
+        GradeBoundary.objects.bulk_create([GradeBoundary(scale=scale, **boundary) for boundary in boundaries])
+        # bulk_create sends no post_save signals, so invalidate cached scales here.
+        transaction.on_commit(bump_grading_version)
+
+    def create(self, validated_data):
+        boundaries = validated_data.pop("boundaries")
+        with transaction.atomic():
+            if validated_data.get("is_default"):
+                GradingScale.objects.filter(is_default=True).update(is_default=False)
+            scale = super().create(validated_data)
+            self._replace_boundaries(scale, boundaries)
+        return scale
+
+    def update(self, instance, validated_data):
+        boundaries = validated_data.pop("boundaries", None)
+        with transaction.atomic():
+            if validated_data.get("is_default"):
+                GradingScale.objects.filter(is_default=True).exclude(pk=instance.pk).update(is_default=False)
+            scale = super().update(instance, validated_data)
+            if boundaries is not None:
+                self._replace_boundaries(scale, boundaries)
+        return scale
+
 
 class ResultSerializer(serializers.ModelSerializer):
-    grade = serializers.SerializerMethodField()
     class Meta:
         model = Result
         fields = [
@@ -145,9 +247,6 @@ class ResultSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["grade", "uploaded_by", "created_at", "updated_at"]
 
-    def get_grade(self, obj):
-        return grade_for_marks(obj.marks)
-
     def validate(self, attrs):
         exam = attrs.get("exam")
         student = attrs.get("student")
@@ -156,16 +255,134 @@ class ResultSerializer(serializers.ModelSerializer):
         return attrs
 
     def create(self, validated_data):
-        validated_data["grade"] = grade_for_marks(validated_data["marks"])
-        validated_data["uploaded_by"] = self.context["request"].user
-        return super().create(validated_data)
+        scale = scale_for_exam(validated_data["exam"])
+        validated_data["grade"] = grade_for_marks(validated_data["marks"], scale)
+        validated_data["uploaded_by_id"] = self.context["request"].user.id
+        with transaction.atomic():
+            result = super().create(validated_data)
+            on_results_changed(result.exam_id, [result.student_id], scale)
+        return result
 
     def update(self, instance, validated_data):
         if is_result_published(instance.student, instance.exam):
             raise serializers.ValidationError("Cannot edit results after exam is published.")
-        if "marks" in validated_data:
-            validated_data["grade"] = grade_for_marks(validated_data["marks"])
-        return super().update(instance, validated_data)
+        scale = scale_for_exam(validated_data.get("exam", instance.exam))
+        if "marks" in validated_data or "exam" in validated_data:
+            validated_data["grade"] = grade_for_marks(validated_data.get("marks", instance.marks), scale)
+        previous_exam_id, previous_student_id = instance.exam_id, instance.student_id
+        with transaction.atomic():
+            result = super().update(instance, validated_data)
+            on_results_changed(result.exam_id, [result.student_id], scale)
+            if (previous_exam_id, previous_student_id) != (result.exam_id, result.student_id):
+                on_results_changed(previous_exam_id, [previous_student_id])
+        return result
+
+
+def _format_marks(value):
+    # Marks are stored with two decimal places; DecimalField would quantize.
+    return None if value is None else f"{value:.2f}"
+
+
+def _format_date(value):
+    return value.isoformat() if value else None
+
+
+def _format_datetime(value, tz):
+    """``DateTimeField`` output in ``tz``, the current time zone resolved once per serializer."""
+    if value is None:
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(tz)
+    value = value.isoformat()
+    return value[:-6] + "Z" if value.endswith("+00:00") else value
+
+
+class RowSerializer:
+    """Read-only, dict-based counterpart of a ``ModelSerializer``.
+
+    Works on ``values()`` rows instead of model instances and builds each
+    output dict directly, skipping DRF's per-field machinery. Subclasses list
+    the ``columns`` they read and define ``to_representation(row)``, which
+    must return the same schema as the model serializer they stand in for.
+    """
+
+    columns = ()
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.timezone = timezone.get_current_timezone()
+
+    @classmethod
+    def values(cls, queryset):
+        return queryset.values(*cls.columns)
+
+    def __iter__(self):
+        return map(self.to_representation, self.rows)
+
+    @property
+    def data(self):
+        return list(self)
+
+
+class ResultRowSerializer(RowSerializer):
+    """``ResultSerializer`` output, taking the stored grade instead of recomputing it."""
+
+    columns = (
+        "id",
+        "student_id",
+        "subject_id",
+        "exam_id",
+        "marks",
+        "grade",
+        "uploaded_by_id",
+        "created_at",
+        "updated_at",
+    )
+
+    def to_representation(self, row):
+        return {
+            "id": row["id"],
+            "student": row["student_id"],
+            "subject": row["subject_id"],
+            "exam": row["exam_id"],
+            "marks": _format_marks(row["marks"]),
+            "grade": row["grade"],
+            "uploaded_by": row["uploaded_by_id"],
+            "created_at": _format_datetime(row["created_at"], self.timezone),
+            "updated_at": _format_datetime(row["updated_at"], self.timezone),
+        }
+
+
+class StudentRowSerializer(RowSerializer):
+    """``StudentSerializer`` read output."""
+
+    columns = (
+        "id",
+        "reg_no",
+        "first_name",
+        "last_name",
+        "gender",
+        "age",
+        "date_of_birth",
+        "class_room_id",
+        "parent_id",
+        "address",
+    )
+
+    def to_representation(self, row):
+        return {
+            "id": row["id"],
+            "reg_no": row["reg_no"],
+            "first_name": row["first_name"],
+            "last_name": row["last_name"],
+            "display_name": f"{row['first_name']} {row['last_name']}".strip(),
+            "gender": row["gender"],
+            "age": row["age"],
+            "date_of_birth": _format_date(row["date_of_birth"]),
+            "class_room": row["class_room_id"],
+            "parent": row["parent_id"],
+            "address": row["address"],
+        }
 
 
 class BulkResultItemSerializer(serializers.Serializer):
@@ -177,3 +394,21 @@ class BulkResultItemSerializer(serializers.Serializer):
 
 class BulkResultUploadSerializer(serializers.Serializer):
     results = BulkResultItemSerializer(many=True)
+
+
+class JobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Job
+        fields = [
+            "id",
+            "kind",
+            "status",
+            "progress",
+            "progress_total",
+            "result",
+            "error",
+            "attempts",
+            "created_at",
+            "started_at",
+            "finished_at",
+        ]
@@ -1,33 +1,39 @@
+import codecs
+import csv
+import hashlib
 from collections import defaultdict
 from decimal import Decimal, ROUND_HALF_UP
+from itertools import islice
 
-from django.db.models import Avg, Sum
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Avg, Count, Exists, F, Max, Min, OuterRef, Q, Sum, Window
+from django.db.models.functions import Rank
+from django.utils import timezone
 
-from .models import Result, ResultPublication, Student, Subject
-
-
-def grade_for_marks(marks):
-    score = Decimal(marks)
-    if score >= Decimal("81"):
-        return "A"
-    if score >= Decimal("61"):
-        return "B"
-    if score >= Decimal("41"):
-        return "C"
-    if score >= Decimal("21"):
-        return "D"
-    return "F"
-
-
-def remarks_for_grade(grade):
-    return {
-        "A": "KIPAWA",
-        "B": "MICHIPUO",
-        "C": "PASS",
-        "D": "PASS",
-        "F": "FAIL",
-    }.get(grade, "")
+from .caching import (
+    ROSTER_VERSION_KEY,
+    bump_exam_version,
+    bump_roster_version,
+    exam_version_key,
+    get_version,
+)
+from .grading import STANDARD_SCALE, grade_for_marks, load_scales, scale_for_exam, scales_for_exams
+from .models import (
+    ClassRoom,
+    Exam,
+    Result,
+    ResultPublication,
+    Student,
+    StudentExamSummary,
+    Subject,
+    SubjectExamAggregate,
+)
 
+CSV_IMPORT_BATCH_SIZE = 500
+ENROLMENT_BATCH_SIZE = 500
 
 def _format_decimal(value):
     if value is None:
@@ -35,6 +41,28 @@ def _format_decimal(value):
     return str(Decimal(value).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP))
 
 
+def iter_upload_lines(upload, encoding="utf-8-sig", chunk_size=64 * 1024):
+    """Decode an uploaded file chunk by chunk and yield it line by line."""
+    decoder = codecs.getincrementaldecoder(encoding)()
+    pending = ""
+    for chunk in upload.chunks(chunk_size):
+        *lines, pending = (pending + decoder.decode(chunk)).split("\n")
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+def iter_batches(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
 def build_subject_headers(subjects):
     headers = []
     used = set()
@@ -62,23 +90,30 @@ def build_class_result_sheet(
         for subject, header in zip(subjects, subject_headers)
     ]
 
-    students = list(Student.objects.filter(class_room=class_room).order_by("first_name", "last_name"))
-    results = Result.objects.filter(exam=exam, student__class_room=class_room)
-    result_map = {(result.student_id, result.subject_id): result for result in results}
-    rankings = calculate_rankings(results)
+    scale = scale_for_exam(exam)
+    # Plain tuples with the stored grade: building model instances and
+    # regrading every cell dominated the cost of large sheets.
+    students = Student.objects.filter(class_room=class_room).order_by("first_name", "last_name")
+    result_map = {
+        (student_id, subject_id): (marks, grade)
+        for student_id, subject_id, marks, grade in Result.objects.filter(
+            exam=exam, student__class_room=class_room
+        ).values_list("student_id", "subject_id", "marks", "grade")
+    }
+    summaries = {
+        summary.student_id: summary
+        for summary in StudentExamSummary.objects.filter(exam=exam, student__class_room=class_room)
+    }
+    missing = (None, None)
 
     rows = []
-    for student in students:
-        total = Decimal("0")
-        count = 0
+    for student_id, reg_no, first_name, last_name, gender in students.values_list(
+        "id", "reg_no", "first_name", "last_name", "gender"
+    ):
+        summary = summaries.get(student_id)
         subject_rows = []
         for subject in subjects:
-            result = result_map.get((student.id, subject.id))
-            marks = result.marks if result else None
-            grade = grade_for_marks(marks) if marks is not None else None
-            if marks is not None:
-                total += Decimal(marks)
-                count += 1
+            marks, grade = result_map.get((student_id, subject.id), missing)
             subject_rows.append(
                 {
                     "subject_id": subject.id,
@@ -86,21 +121,21 @@ def build_class_result_sheet(
                     "grade": grade if include_grades and grade is not None else "",
                 }
             )
-        average = (total / count) if count else None
-        average_grade = grade_for_marks(average) if include_grades and average is not None else ""
-        remarks = remarks_for_grade(average_grade) if average_grade else ""
+        has_totals = include_totals and summary is not None and summary.subject_count
+        average_grade = summary.average_grade if include_grades and summary else ""
+        remarks = scale.remarks_for(average_grade) if average_grade else ""
         rows.append(
             {
-                "student_id": student.id,
-                "reg_no": student.reg_no or "",
-                "full_name": f"{student.first_name} {student.last_name}",
-                "gender": student.gender,
+                "student_id": student_id,
+                "reg_no": reg_no or "",
+                "full_name": f"{first_name} {last_name}",
+                "gender": gender,
                 "subjects": subject_rows,
-                "total": _format_decimal(total) if include_totals and count else "",
-                "average": _format_decimal(average) if include_totals and average is not None else "",
+                "total": _format_decimal(summary.total) if has_totals else "",
+                "average": _format_decimal(summary.average) if has_totals else "",
                 "average_grade": average_grade,
                 "remarks": remarks,
-                "rank": rankings.get(student.id, ""),
+                "rank": summary.rank if summary and summary.rank else "",
             }
         )
 
@@ -110,26 +145,107 @@ def build_class_result_sheet(
     }
 
 
-def calculate_student_totals(results):
-    totals = defaultdict(lambda: {"total": Decimal("0"), "subjects": 0})
-    for result in results:
-        totals[result.student_id]["total"] += result.marks
-        totals[result.student_id]["subjects"] += 1
-    return totals
+def mask_class_result_sheet(sheet, include_marks=True, include_grades=True, include_totals=True):
+    """Blank the columns of a full result sheet that a caller may not see."""
+    rows = []
+    for row in sheet["rows"]:
+        average_grade = row["average_grade"] if include_grades else ""
+        rows.append(
+            {
+                **row,
+                "subjects": [
+                    {
+                        "subject_id": subject["subject_id"],
+                        "marks": subject["marks"] if include_marks else "",
+                        "grade": subject["grade"] if include_grades else "",
+                    }
+                    for subject in row["subjects"]
+                ],
+                "total": row["total"] if include_totals else "",
+                "average": row["average"] if include_totals else "",
+                "average_grade": average_grade,
+                "remarks": row["remarks"] if average_grade else "",
+            }
+        )
+    return {"subjects": sheet["subjects"], "rows": rows}
+
+
+def cached_class_result_sheet(class_room, exam, include_marks=True, include_grades=True, include_totals=True):
+    """``build_class_result_sheet`` behind the cache framework.
 
+    The key carries the exam's data version, bumped on every result write
+    and exam change, and the roster version, bumped on student and subject
+    changes, so entries never need explicit deletion.
+    """
+    cache_key = "core:class-sheet:{}:{}:{}{}{}:{}:{}".format(
+        class_room.id,
+        exam.id,
+        int(include_marks),
+        int(include_grades),
+        int(include_totals),
+        get_version(exam_version_key(exam.id)),
+        get_version(ROSTER_VERSION_KEY),
+    )
+    sheet = cache.get(cache_key)
+    if sheet is None:
+        sheet = build_class_result_sheet(
+            class_room,
+            exam,
+            include_marks=include_marks,
+            include_grades=include_grades,
+            include_totals=include_totals,
+        )
+        cache.set(cache_key, sheet, settings.RESULT_SHEET_CACHE_TIMEOUT)
+    return sheet
 
-def calculate_rankings(results):
-    totals = calculate_student_totals(results)
-    ranked = sorted(
-        totals.items(), key=lambda item: item[1]["total"], reverse=True
+
+def ranked_totals(results, partition_by=(), **aggregates):
+    """Annotate per-student totals with ``RANK()`` over the descending total.
+
+    ``partition_by`` names extra grouping columns that ranks restart within,
+    e.g. ``("subject_id",)`` for per-subject or ``("student__gender",)`` for
+    per-gender positions. ``aggregates`` are computed in the same grouped
+    query, e.g. ``average=Avg("marks")``.
+    """
+    partition_by = list(partition_by)
+    return (
+        results.values("student_id", *partition_by)
+        .annotate(total=Sum("marks"), **aggregates)
+        .annotate(
+            rank=Window(
+                expression=Rank(),
+                partition_by=[F(field) for field in partition_by] or None,
+                order_by=F("total").desc(),
+            )
+        )
+        .order_by(*partition_by, "rank")
     )
-    ranks = {}
-    current_rank = 1
-    for index, (student_id, data) in enumerate(ranked):
-        if index > 0 and data["total"] < ranked[index - 1][1]["total"]:
-            current_rank = index + 1
-        ranks[student_id] = current_rank
-    return ranks
+
+
+def calculate_rankings(results, partition_by=()):
+    """Map student ids (or ``(student_id, *partition)`` tuples) to their rank."""
+    rankings = {}
+    for entry in ranked_totals(results, partition_by):
+        if partition_by:
+            key = (entry["student_id"], *(entry[field] for field in partition_by))
+        else:
+            key = entry["student_id"]
+        rankings[key] = entry["rank"]
+    return rankings
+
+
+def result_validators(results, *extra):
+    """Cheap ``(etag, last_modified)`` pair for a set of results.
+
+    ``extra`` holds anything else the response depends on, such as the
+    exam's publish time or the roster version. ``last_modified`` is the
+    newest of the datetimes involved, or ``None``.
+    """
+    state = results.aggregate(last_updated=Max("updated_at"), count=Count("id"))
+    parts = [state["count"], state["last_updated"], *extra]
+    etag = hashlib.md5(repr(parts).encode("utf-8")).hexdigest()
+    timestamps = [part for part in (state["last_updated"], *extra) if hasattr(part, "timestamp")]
+    return etag, max(timestamps) if timestamps else None
 
 
 def is_result_published(student, exam):
@@ -138,39 +254,597 @@ def is_result_published(student, exam):
     return ResultPublication.objects.filter(student=student, exam=exam).exists()
 
 
+def upsert_results(entries, user=None, batch_size=1000, scales=None, refresh=True):
+    """Insert or update results with one ``INSERT ... ON CONFLICT`` per batch.
+
+    ``entries`` is an iterable of ``(student_id, subject_id, exam_id, marks)``
+    tuples. ``scales`` maps exam ids to grading scales and is looked up when
+    not given. With ``refresh`` off, summaries and aggregates are left for
+    the caller to bring up to date with ``on_results_changed``. Returns
+    ``(created, updated)`` counted the same way repeated
+    ``update_or_create`` calls would count them.
+    """
+    latest = {}
+    count = 0
+    for student_id, subject_id, exam_id, marks in entries:
+        latest[(student_id, subject_id, exam_id)] = marks
+        count += 1
+    if not latest:
+        return 0, 0
+
+    uploaded_by_id = user.id if user is not None else None
+    if scales is None:
+        scales = scales_for_exams({key[2] for key in latest})
+    objs = [
+        Result(
+            student_id=student_id,
+            subject_id=subject_id,
+            exam_id=exam_id,
+            marks=marks,
+            grade=grade_for_marks(marks, scales.get(exam_id)),
+            uploaded_by_id=uploaded_by_id,
+        )
+        for (student_id, subject_id, exam_id), marks in latest.items()
+    ]
+    with transaction.atomic():
+        existing = set(
+            Result.objects.filter(
+                student_id__in={key[0] for key in latest},
+                subject_id__in={key[1] for key in latest},
+                exam_id__in={key[2] for key in latest},
+            ).values_list("student_id", "subject_id", "exam_id")
+        )
+        Result.objects.bulk_create(
+            objs,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=["student", "subject", "exam"],
+            update_fields=["marks", "grade", "uploaded_by", "updated_at"],
+        )
+        if refresh:
+            changed = defaultdict(set)
+            for student_id, _, exam_id in latest:
+                changed[exam_id].add(student_id)
+            for exam_id, student_ids in changed.items():
+                on_results_changed(exam_id, student_ids, scales.get(exam_id))
+    created = sum(1 for key in latest if key not in existing)
+    return created, count - created
+
+
+def import_class_results_csv(class_room, exam, upload, user, progress=None):
+    """Validate and write a class result CSV in streamed batches.
+
+    All rows are written in one transaction that is rolled back if any row
+    fails; summaries and aggregates are refreshed once, after the last
+    batch. ``progress`` is called with the number of rows read after each
+    batch. Returns ``(ok, data)`` where ``data`` is the response body.
+    """
+    subjects = list(Subject.objects.filter(class_room=class_room).order_by("name"))
+    scales = {exam.id: scale_for_exam(exam)}
+
+    reader = csv.DictReader(iter_upload_lines(upload))
+    if not reader.fieldnames:
+        return False, {"detail": "CSV header row is required."}
+
+    def normalize(value):
+        return "".join(str(value).strip().lower().split())
+
+    normalized_headers = {}
+    for header in reader.fieldnames:
+        key = normalize(header)
+        normalized_headers.setdefault(key, []).append(header)
+
+    def find_header(candidates):
+        for candidate in candidates:
+            key = normalize(candidate)
+            if key in normalized_headers:
+                return normalized_headers[key][0]
+        return None
+
+    reg_no_header = find_header(["Reg no", "Reg No", "RegNo", "Registration No", "Reg #"])
+    student_id_header = find_header(["Student ID", "student_id", "student id", "ID"])
+    if not reg_no_header and not student_id_header:
+        return False, {"detail": "Missing 'Reg no' or 'Student ID' column in CSV."}
+
+    subject_marks_map = {}
+    missing_subjects = []
+    for subject in subjects:
+        name_key = normalize(subject.name)
+        code_key = normalize(subject.code or "")
+        mark_header = None
+        if name_key in normalized_headers:
+            mark_header = normalized_headers[name_key][0]
+        elif code_key in normalized_headers:
+            mark_header = normalized_headers[code_key][0]
+        if not mark_header:
+            missing_subjects.append(subject.name)
+        else:
+            subject_marks_map[mark_header] = subject
+
+    if missing_subjects:
+        return False, {"detail": "Missing subject columns in CSV.", "missing": missing_subjects}
+
+    published_ids = set(
+        ResultPublication.objects.filter(exam=exam, student__class_room=class_room).values_list(
+            "student_id", flat=True
+        )
+    )
+    errors = []
+    created = 0
+    updated = 0
+    rows_read = 0
+    touched_ids = set()
+    with transaction.atomic():
+        for batch in iter_batches(enumerate(reader, start=2), CSV_IMPORT_BATCH_SIZE):
+            reg_nos = set()
+            raw_ids = set()
+            for _, row in batch:
+                reg_no = (row.get(reg_no_header) or "").strip() if reg_no_header else ""
+                if reg_no:
+                    reg_nos.add(reg_no)
+                elif student_id_header:
+                    raw_ids.add((row.get(student_id_header) or "").strip())
+            student_ids = set()
+            for value in raw_ids:
+                try:
+                    student_ids.add(int(value))
+                except ValueError:
+                    continue
+            students = Student.objects.filter(class_room=class_room).filter(
+                Q(reg_no__in=reg_nos) | Q(id__in=student_ids)
+            )
+            id_by_reg_no = {}
+            known_ids = set()
+            for student_id, reg_no in students.values_list("id", "reg_no"):
+                known_ids.add(student_id)
+                if reg_no:
+                    id_by_reg_no[reg_no] = student_id
+
+            operations = []
+            for index, row in batch:
+                student_id = None
+                if reg_no_header:
+                    reg_no = (row.get(reg_no_header) or "").strip()
+                    if reg_no:
+                        student_id = id_by_reg_no.get(reg_no)
+                        if not student_id:
+                            errors.append({"row": index, "error": f"Reg no '{reg_no}' not found in class."})
+                            continue
+                if not student_id and student_id_header:
+                    raw_student_id = (row.get(student_id_header) or "").strip()
+                    if not raw_student_id:
+                        errors.append({"row": index, "error": "Student ID is required."})
+                        continue
+                    try:
+                        student_id = int(raw_student_id)
+                    except ValueError:
+                        errors.append({"row": index, "error": f"Invalid Student ID '{raw_student_id}'."})
+                        continue
+                    if student_id not in known_ids:
+                        errors.append({"row": index, "error": f"Student ID {student_id} not found in class."})
+                        continue
+
+                if not student_id:
+                    errors.append({"row": index, "error": "Student identifier is required."})
+                    continue
+
+                if student_id in published_ids:
+                    errors.append({"row": index, "error": "Results already published for this student."})
+                    continue
+
+                for header, subject in subject_marks_map.items():
+                    raw_marks = (row.get(header) or "").strip()
+                    if raw_marks == "":
+                        continue
+                    try:
+                        marks = Decimal(raw_marks)
+                    except Exception:
+                        errors.append({"row": index, "error": f"Invalid marks '{raw_marks}' for {header}."})
+                        continue
+                    if marks < 0 or marks > 100:
+                        errors.append({"row": index, "error": f"Marks out of range for {header}."})
+                        continue
+                    operations.append((student_id, subject.id, exam.id, marks))
+
+            if not errors:
+                batch_created, batch_updated = upsert_results(operations, user, scales=scales, refresh=False)
+                created += batch_created
+                updated += batch_updated
+                touched_ids.update(operation[0] for operation in operations)
+            rows_read += len(batch)
+            if progress:
+                progress(rows_read)
+        if errors:
+            transaction.set_rollback(True)
+        elif touched_ids:
+            on_results_changed(exam.id, touched_ids, scales[exam.id])
+
+    if errors:
+        return False, {"detail": "Validation errors in CSV.", "errors": errors}
+
+    return True, {"created": created, "updated": updated, "total": created + updated}
+
+
+ENROLMENT_COLUMNS = {
+    "firstname": "first_name",
+    "lastname": "last_name",
+    "fullname": "full_name",
+    "name": "full_name",
+    "gender": "gender",
+    "sex": "gender",
+    "age": "age",
+    "dateofbirth": "date_of_birth",
+    "dob": "date_of_birth",
+    "class": "class_room",
+    "classroom": "class_room",
+    "classname": "class_room",
+    "parent": "parent",
+    "parentid": "parent",
+    "address": "address",
+}
+
+
+def normalize_enrolment_row(row):
+    """Map loosely named enrolment columns to student fields, dropping blanks."""
+    normalized = {}
+    for key, value in row.items():
+        field = ENROLMENT_COLUMNS.get("".join(str(key).lower().replace("_", "").split()))
+        if field is None or value is None:
+            continue
+        value = value.strip() if isinstance(value, str) else value
+        if value == "":
+            continue
+        if field == "gender" and isinstance(value, str):
+            value = value[:1].upper()
+        normalized[field] = value
+    return normalized
+
+
+def read_enrolment_csv(upload):
+    return [normalize_enrolment_row(row) for row in csv.DictReader(iter_upload_lines(upload))]
+
+
+def enrol_students(rows, first_row=1):
+    """Create students from validated enrolment rows in one batch.
+
+    ``class_room`` in each row is a class id or name; every class and parent
+    is resolved with one query each, reg nos are reserved in one statement
+    and the students are inserted with ``bulk_create``. Nothing is written
+    if any row fails. Returns ``(students, errors)``.
+    """
+    class_ids = {}
+    for class_id, name in ClassRoom.objects.values_list("id", "name"):
+        class_ids[str(class_id)] = class_id
+        class_ids.setdefault(name.strip().lower(), class_id)
+    User = get_user_model()
+    parent_ids = set(
+        User.objects.filter(id__in={row["parent"] for row in rows if row.get("parent")}).values_list(
+            "id", flat=True
+        )
+    )
+
+    students = []
+    errors = []
+    for index, row in enumerate(rows, start=first_row):
+        class_room = str(row["class_room"]).strip()
+        class_id = class_ids.get(class_room) or class_ids.get(class_room.lower())
+        if class_id is None:
+            errors.append({"row": index, "error": f"Class '{class_room}' not found."})
+            continue
+        if row.get("parent") and row["parent"] not in parent_ids:
+            errors.append({"row": index, "error": f"Parent {row['parent']} not found."})
+            continue
+        students.append(
+            Student(
+                first_name=row["first_name"],
+                last_name=row.get("last_name", ""),
+                gender=row["gender"],
+                age=row.get("age"),
+                date_of_birth=row.get("date_of_birth"),
+                class_room_id=class_id,
+                parent_id=row.get("parent"),
+                address=row.get("address"),
+            )
+        )
+    if errors:
+        return [], errors
+
+    with transaction.atomic():
+        for student, reg_no in zip(students, Student.reserve_reg_nos(len(students)) if students else []):
+            student.reg_no = reg_no
+        students = Student.objects.bulk_create(students, batch_size=ENROLMENT_BATCH_SIZE)
+        # bulk_create sends no post_save signals, so invalidate roster caches here.
+        transaction.on_commit(bump_roster_version)
+    return students, []
+
+
+def refresh_exam_summaries(exam_id, student_ids=None, scale=None):
+    """Recompute StudentExamSummary rows for an exam and re-rank the class.
+
+    Only the given students' totals are recomputed; ranks are always
+    reassigned across the whole class because any change can shift them.
+    The exam row is locked first, so concurrent writers for one exam rank
+    in turn and the last one sees every committed total. ``scale`` is the
+    exam's grading scale, looked up when not given.
+    """
+    with transaction.atomic(savepoint=False):
+        list(Exam.objects.select_for_update().filter(pk=exam_id).values_list("id", flat=True))
+        if scale is None:
+            scale = scales_for_exams([exam_id]).get(exam_id)
+        results = Result.objects.filter(exam_id=exam_id, student__class_room=F("exam__class_room"))
+        summaries = StudentExamSummary.objects.filter(exam_id=exam_id)
+        if student_ids is not None:
+            results = results.filter(student_id__in=student_ids)
+            summaries = summaries.filter(student_id__in=student_ids)
+
+        rows = []
+        for entry in results.values("student_id").annotate(total=Sum("marks"), subject_count=Count("id")):
+            average = entry["total"] / entry["subject_count"]
+            rows.append(
+                StudentExamSummary(
+                    student_id=entry["student_id"],
+                    exam_id=exam_id,
+                    total=entry["total"],
+                    subject_count=entry["subject_count"],
+                    average=average.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP),
+                    average_grade=grade_for_marks(average, scale),
+                )
+            )
+        summaries.exclude(student_id__in=[row.student_id for row in rows]).delete()
+        StudentExamSummary.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=["student", "exam"],
+            update_fields=["total", "subject_count", "average", "average_grade", "updated_at"],
+        )
+        ranked = StudentExamSummary.objects.filter(exam_id=exam_id).annotate(
+            position=Window(expression=Rank(), order_by=F("total").desc())
+        )
+        changed = []
+        for summary in ranked:
+            if summary.rank != summary.position:
+                summary.rank = summary.position
+                changed.append(summary)
+        StudentExamSummary.objects.bulk_update(changed, ["rank"])
+
+
+def refresh_subject_aggregates(exam_id, scale=None):
+    """Recompute the per-subject SubjectExamAggregate rows of one exam."""
+    exam = Exam.objects.get(id=exam_id)
+    pass_mark = (scale or scale_for_exam(exam)).pass_mark
+    entries = (
+        Result.objects.filter(exam=exam, student__class_room_id=exam.class_room_id)
+        .values("subject_id")
+        .annotate(
+            result_count=Count("id"),
+            pass_count=Count("id", filter=Q(marks__gte=pass_mark)),
+            total_marks=Sum("marks"),
+            min_marks=Min("marks"),
+            max_marks=Max("marks"),
+        )
+    )
+    rows = [
+        SubjectExamAggregate(
+            class_room_id=exam.class_room_id,
+            exam=exam,
+            average=(entry["total_marks"] / entry["result_count"]).quantize(
+                Decimal("0.01"), rounding=ROUND_HALF_UP
+            ),
+            **entry,
+        )
+        for entry in entries
+    ]
+    with transaction.atomic():
+        SubjectExamAggregate.objects.filter(exam=exam).exclude(
+            subject_id__in=[row.subject_id for row in rows]
+        ).delete()
+        SubjectExamAggregate.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=["subject", "exam"],
+            update_fields=[
+                "class_room",
+                "result_count",
+                "pass_count",
+                "total_marks",
+                "average",
+                "min_marks",
+                "max_marks",
+                "updated_at",
+            ],
+        )
+
+
+def on_results_changed(exam_id, student_ids, scale=None):
+    """Bring derived data up to date after results for an exam were written.
+
+    Both refreshes run under the exam lock taken by ``refresh_exam_summaries``.
+    """
+    with transaction.atomic(savepoint=False):
+        refresh_exam_summaries(exam_id, student_ids, scale)
+        refresh_subject_aggregates(exam_id, scale)
+    transaction.on_commit(lambda: bump_exam_version(exam_id))
+
+
+def exams_graded_by(scale_ids, include_default=False):
+    """Exams whose own or class scale is in ``scale_ids``, plus, with
+    ``include_default``, those that fall back to the default scale."""
+    condition = Q(grading_scale_id__in=scale_ids) | Q(
+        grading_scale__isnull=True, class_room__grading_scale_id__in=scale_ids
+    )
+    if include_default:
+        condition |= Q(grading_scale__isnull=True, class_room__grading_scale__isnull=True)
+    return Exam.objects.filter(condition)
+
+
+def regrade_exams(exams):
+    """Rewrite the stored grades of the unpublished results of ``exams``.
+
+    Exams are grouped by their resolved scale and each group is regraded
+    with one ``UPDATE ... CASE`` over results and one over summaries, so the
+    cost does not depend on how many rows change. Scales are read from the
+    database rather than the process cache, which only follows committed
+    edits. Returns the number of results regraded.
+    """
+    scales, default_id, _ = load_scales()
+    exam_ids_by_scale = defaultdict(list)
+    for exam_id, exam_scale_id, class_scale_id in exams.filter(is_published=False).values_list(
+        "id", "grading_scale_id", "class_room__grading_scale_id"
+    ):
+        exam_ids_by_scale[exam_scale_id or class_scale_id or default_id].append(exam_id)
+
+    unpublished = ~Exists(
+        ResultPublication.objects.filter(student_id=OuterRef("student_id"), exam_id=OuterRef("exam_id"))
+    )
+    # Touching updated_at moves the ETags and report card cache keys that
+    # fingerprint results, since remarks may change even where grades do not.
+    now = timezone.now()
+    regraded = 0
+    with transaction.atomic():
+        for scale_id, exam_ids in exam_ids_by_scale.items():
+            scale = scales.get(scale_id, STANDARD_SCALE)
+            regraded += Result.objects.filter(unpublished, exam_id__in=exam_ids).update(
+                grade=scale.case("marks"), updated_at=now
+            )
+            StudentExamSummary.objects.filter(unpublished, exam_id__in=exam_ids).update(
+                average_grade=scale.case("total", per="subject_count"), updated_at=now
+            )
+            for exam_id in exam_ids:
+                refresh_subject_aggregates(exam_id, scale)
+                transaction.on_commit(lambda exam_id=exam_id: bump_exam_version(exam_id))
+    return regraded
+
+
 def analytics_for_class(class_room, exam):
     results = Result.objects.filter(exam=exam, student__class_room=class_room)
-    class_average = results.aggregate(average=Avg("marks"))["average"] or 0
+    scale = scale_for_exam(exam)
+    grade_aggregates = scale.count_aggregates()
+    stats = results.aggregate(
+        class_average=Avg("marks"),
+        **{f"grade_{grade}": aggregate for grade, aggregate in grade_aggregates.items()},
+    )
     subject_averages = (
         results.values("subject__id", "subject__name")
         .annotate(average=Avg("marks"))
         .order_by("subject__name")
     )
-    totals = results.values("student").annotate(total=Sum("marks")).order_by("-total")
-    top_students = []
-    for entry in totals[:5]:
-        student = Student.objects.get(id=entry["student"])
-        top_students.append(
-            {
-                "id": student.id,
-                "name": f"{student.first_name} {student.last_name}",
-                "total": entry["total"],
-            }
-        )
-    grade_distribution = defaultdict(int)
-    pass_count = 0
-    fail_count = 0
-    for result in results:
-        grade = grade_for_marks(result.marks)
-        grade_distribution[grade] += 1
-        if grade == "F":
-            fail_count += 1
-        else:
-            pass_count += 1
+    top_students = [
+        {
+            "id": entry["student_id"],
+            "name": f"{entry['student__first_name']} {entry['student__last_name']}",
+            "total": entry["total"],
+        }
+        for entry in results.values("student_id", "student__first_name", "student__last_name")
+        .annotate(total=Sum("marks"))
+        .order_by("-total", "student_id")[:5]
+    ]
+    grade_distribution = {
+        grade: stats[f"grade_{grade}"] for grade in grade_aggregates if stats[f"grade_{grade}"]
+    }
+    fail_count = sum(stats[f"grade_{grade}"] for grade in scale.fail_grades)
+    pass_count = sum(grade_distribution.values()) - fail_count
     return {
-        "class_average": class_average,
+        "class_average": stats["class_average"] or 0,
         "subject_averages": list(subject_averages),
         "top_students": top_students,
         "pass_fail_rate": {"pass": pass_count, "fail": fail_count},
         "grade_distribution": grade_distribution,
     }
+
+
+def _rate(part, whole):
+    if not whole:
+        return None
+    return (Decimal(part) * 100 / whole).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+
+
+def _delta(current, previous):
+    if current is None or previous is None:
+        return None
+    return current - previous
+
+
+def performance_trends(class_room, student_id=None):
+    """Term-over-term averages for a class from the precomputed aggregates.
+
+    Exams are ordered by year, then term order, then id. Each point carries
+    its change from the previous exam the class (or student) sat.
+    """
+    exams = list(Exam.objects.filter(class_room=class_room).order_by("year", "term_order", "id"))
+    aggregates = SubjectExamAggregate.objects.filter(class_room=class_room).select_related("subject")
+    exam_totals = defaultdict(lambda: [Decimal("0"), 0, 0])
+    subject_points = {}
+    for aggregate in aggregates:
+        totals = exam_totals[aggregate.exam_id]
+        totals[0] += aggregate.total_marks
+        totals[1] += aggregate.result_count
+        totals[2] += aggregate.pass_count
+        subject = subject_points.setdefault(
+            aggregate.subject_id,
+            {"id": aggregate.subject_id, "name": aggregate.subject.name, "code": aggregate.subject.code, "points": {}},
+        )
+        subject["points"][aggregate.exam_id] = {
+            "average": aggregate.average,
+            "pass_rate": _rate(aggregate.pass_count, aggregate.result_count),
+            "count": aggregate.result_count,
+        }
+
+    exam_rows = []
+    previous = None
+    for exam in exams:
+        total, count, passed = exam_totals.get(exam.id, (Decimal("0"), 0, 0))
+        average = (total / count).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP) if count else None
+        exam_rows.append(
+            {
+                "id": exam.id,
+                "name": exam.name,
+                "term": exam.term,
+                "year": exam.year,
+                "class_average": average,
+                "pass_rate": _rate(passed, count),
+                "delta": _delta(average, previous),
+            }
+        )
+        if average is not None:
+            previous = average
+
+    subjects = []
+    for subject in sorted(subject_points.values(), key=lambda item: item["name"]):
+        points = []
+        previous = None
+        for exam in exams:
+            point = subject["points"].get(exam.id)
+            if not point:
+                continue
+            points.append({"exam_id": exam.id, **point, "delta": _delta(point["average"], previous)})
+            previous = point["average"]
+        subjects.append({**subject, "points": points})
+
+    summaries = StudentExamSummary.objects.filter(exam__class_room=class_room).values(
+        "student_id", "student__first_name", "student__last_name", "exam_id", "total", "average", "rank"
+    )
+    if student_id:
+        summaries = summaries.filter(student_id=student_id)
+    exam_order = {exam.id: index for index, exam in enumerate(exams)}
+    students = {}
+    for entry in sorted(summaries, key=lambda item: (item["student_id"], exam_order.get(item["exam_id"], 0))):
+        student = students.setdefault(
+            entry["student_id"],
+            {
+                "id": entry["student_id"],
+                "name": f"{entry['student__first_name']} {entry['student__last_name']}",
+                "points": [],
+            },
+        )
+        previous = student["points"][-1]["average"] if student["points"] else None
+        student["points"].append(
+            {
+                "exam_id": entry["exam_id"],
+                "total": entry["total"],
+                "average": entry["average"],
+                "rank": entry["rank"],
+                "delta": _delta(entry["average"], previous),
+            }
+        )
+
+    return {"exams": exam_rows, "subjects": subjects, "students": list(students.values())}
@@ -0,0 +1,110 @@
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from .caching import bump_exam_version, bump_grading_version, bump_roster_version, clear_local_versions
+from .models import (
+    ClassRoom,
+    Exam,
+    GradeBoundary,
+    GradingScale,
+    Permission,
+    Result,
+    RolePermission,
+    Student,
+    Subject,
+    UserRole,
+)
+from .permissions import bump_permission_version, clear_local_permission_codes
+from .services import on_results_changed
+
+# User flags copied into permission-claim tokens; changing one must retire
+# the tokens that carry the old value.
+TOKEN_USER_FIELDS = ("is_active", "is_staff", "is_superuser")
+
+
+@receiver(setting_changed)
+def forget_local_versions(setting, **kwargs):
+    # Versions read from one cache mean nothing once another replaces it.
+    if setting == "CACHES":
+        clear_local_versions()
+        clear_local_permission_codes()
+
+
+@receiver(post_save, sender=Permission)
+@receiver(post_delete, sender=Permission)
+@receiver(post_save, sender=RolePermission)
+@receiver(post_delete, sender=RolePermission)
+@receiver(post_save, sender=UserRole)
+@receiver(post_delete, sender=UserRole)
+def invalidate_permission_cache(sender, **kwargs):
+    transaction.on_commit(bump_permission_version)
+
+
+@receiver(post_init, sender=settings.AUTH_USER_MODEL)
+def remember_token_user_fields(sender, instance, **kwargs):
+    instance._token_user_fields = tuple(instance.__dict__.get(field) for field in TOKEN_USER_FIELDS)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidate_user_tokens(sender, instance, created, **kwargs):
+    current = tuple(instance.__dict__.get(field) for field in TOKEN_USER_FIELDS)
+    if not created and current != instance._token_user_fields:
+        transaction.on_commit(bump_permission_version)
+    instance._token_user_fields = current
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def invalidate_deleted_user_tokens(sender, **kwargs):
+    transaction.on_commit(bump_permission_version)
+
+
+@receiver(post_save, sender=Student)
+@receiver(post_delete, sender=Student)
+@receiver(post_save, sender=Subject)
+@receiver(post_delete, sender=Subject)
+def invalidate_roster_caches(sender, **kwargs):
+    transaction.on_commit(bump_roster_version)
+
+
+@receiver(post_save, sender=Exam)
+def invalidate_exam_caches(sender, instance, **kwargs):
+    transaction.on_commit(lambda: bump_exam_version(instance.id))
+
+
+@receiver(post_save, sender=GradingScale)
+@receiver(post_delete, sender=GradingScale)
+@receiver(post_save, sender=GradeBoundary)
+@receiver(post_delete, sender=GradeBoundary)
+@receiver(post_save, sender=ClassRoom)
+@receiver(post_delete, sender=ClassRoom)
+def invalidate_grading_scales(sender, **kwargs):
+    transaction.on_commit(bump_grading_version)
+
+
+_deleted_results = threading.local()
+
+
+def _refresh_after_deletes():
+    pending = getattr(_deleted_results, "pending", None) or {}
+    _deleted_results.pending = None
+    for exam_id in Exam.objects.filter(id__in=pending).values_list("id", flat=True):
+        on_results_changed(exam_id, pending[exam_id])
+
+
+@receiver(post_delete, sender=Result)
+def refresh_summaries_after_delete(sender, instance, **kwargs):
+    # Cascades delete many results at once; collect them and refresh each
+    # exam once after commit. The callback is queued per row, but only the
+    # first one to run finds anything left to do.
+    pending = getattr(_deleted_results, "pending", None)
+    if pending is None:
+        pending = _deleted_results.pending = defaultdict(set)
+    pending[instance.exam_id].add(instance.student_id)
+    transaction.on_commit(_refresh_after_deletes)
+
@@ -0,0 +1,67 @@
+import hashlib
+import json
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import PublishedResultSnapshot, Result
+from .reports import class_report_cards_by_student
+from .serializers import ResultRowSerializer
+from .services import build_class_result_sheet
+
+
+def build_result_snapshot(exam):
+    """Everything served for a published exam, as plain JSON-ready data.
+
+    Holds the full class sheet (marks, grades, totals, averages and ranks),
+    each student's serialized result rows and each student's report card.
+    """
+    class_room = exam.class_room
+    results_by_student = {}
+    results = ResultRowSerializer.values(Result.objects.filter(exam=exam).order_by("id"))
+    for row in ResultRowSerializer(results):
+        results_by_student.setdefault(str(row["student"]), []).append(row)
+    return {
+        "sheet": build_class_result_sheet(class_room, exam),
+        "results": results_by_student,
+        "report_cards": {
+            str(student_id): card
+            for student_id, card in class_report_cards_by_student(class_room, exam).items()
+        },
+    }
+
+
+def create_result_snapshot(exam):
+    data = zlib.compress(json.dumps(build_result_snapshot(exam), cls=DjangoJSONEncoder).encode("utf-8"))
+    snapshot, _ = PublishedResultSnapshot.objects.update_or_create(
+        exam=exam, defaults={"published_at": exam.published_at, "data": data}
+    )
+    return snapshot
+
+
+def published_snapshot(exam):
+    """The exam's snapshot if it is published and was snapshotted at that publish."""
+    if not exam.is_published:
+        return None
+    snapshot = PublishedResultSnapshot.objects.filter(exam_id=exam.id).first()
+    if snapshot is None or snapshot.published_at != exam.published_at:
+        return None
+    return snapshot
+
+
+def snapshot_content(snapshot):
+    return json.loads(zlib.decompress(bytes(snapshot.data)))
+
+
+def snapshot_validators(snapshot, *extra):
+    """``(etag, last_modified)`` for data read from a snapshot."""
+    parts = [snapshot.exam_id, snapshot.created_at, *extra]
+    return hashlib.md5(repr(parts).encode("utf-8")).hexdigest(), snapshot.created_at
+
+
+def published_report_cards(exam):
+    """Report card data for every student from the exam's snapshot, or ``None``."""
+    snapshot = published_snapshot(exam)
+    if snapshot is None:
+        return None
+    return list(snapshot_content(snapshot)["report_cards"].values())
@@ -0,0 +1,30 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from core.caching import clear_local_versions
+from core.grading import default_scale, scale_cache
+from core.models import GradeBoundary, GradingScale
+
+
+class ScaleCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        clear_local_versions()
+        scale_cache.clear()
+
+    def test_warm_lookups_run_no_queries(self):
+        default_scale()
+        with self.assertNumQueries(0):
+            for _ in range(5):
+                default_scale()
+
+    def test_scale_edit_reloads_the_copy(self):
+        self.assertEqual(default_scale().grade(Decimal("85")), "A")
+        scale = GradingScale.objects.get(is_default=True)
+        with self.captureOnCommitCallbacks(execute=True):
+            GradeBoundary.objects.filter(scale=scale, grade="A").update(min_marks=Decimal("90"))
+            # update() sends no signal; saving the scale bumps the version.
+            scale.save()
+        self.assertEqual(default_scale().grade(Decimal("85")), "B")
@@ -0,0 +1,115 @@
+import threading
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core import jobs
+from core.jobs import Heartbeat, JobFailed, claim_next_job, enqueue, requeue_stale_jobs
+from core.management.commands.run_jobs import Command
+from core.models import Job
+
+
+def succeed(job):
+    return {"echo": job.payload}
+
+
+def reject(job):
+    raise JobFailed("Rejected.", {"rows": 3})
+
+
+def crash(job):
+    raise ValueError("boom")
+
+
+@override_settings(JOB_LEASE_TIMEOUT=60, JOB_MAX_ATTEMPTS=2)
+class JobQueueTests(TestCase):
+    def setUp(self):
+        handlers = mock.patch.dict(jobs.JOB_HANDLERS, {"succeed": succeed, "reject": reject, "crash": crash})
+        handlers.start()
+        self.addCleanup(handlers.stop)
+
+    def run_worker(self):
+        # The worker closes its connection on exit; keep the test's open.
+        with mock.patch("core.management.commands.run_jobs.connection"):
+            Command(stdout=StringIO()).work(poll_interval=0, once=True)
+
+    def abandon(self, job, attempts):
+        """Leave ``job`` running as if its worker died two leases ago."""
+        stale = timezone.now() - timedelta(seconds=120)
+        Job.objects.filter(pk=job.pk).update(
+            status=Job.STATUS_RUNNING, attempts=attempts, started_at=stale, heartbeat_at=stale
+        )
+
+    def test_claims_the_oldest_queued_job_once(self):
+        first, second = enqueue("succeed", {"n": 1}), enqueue("succeed", {"n": 2})
+        claimed = claim_next_job()
+        self.assertEqual(claimed.pk, first.pk)
+        self.assertEqual((claimed.status, claimed.attempts), (Job.STATUS_RUNNING, 1))
+        self.assertIsNotNone(claimed.heartbeat_at)
+        self.assertEqual(claim_next_job().pk, second.pk)
+        self.assertIsNone(claim_next_job())
+
+    def test_heartbeat_renews_only_running_jobs(self):
+        enqueue("succeed")
+        job = claim_next_job()
+        Job.objects.filter(pk=job.pk).update(heartbeat_at=timezone.now() - timedelta(seconds=30))
+        job.heartbeat()
+        job.refresh_from_db()
+        self.assertLess(timezone.now() - job.heartbeat_at, timedelta(seconds=5))
+        Job.objects.filter(pk=job.pk).update(status=Job.STATUS_SUCCEEDED, heartbeat_at=None)
+        job.heartbeat()
+        job.refresh_from_db()
+        self.assertIsNone(job.heartbeat_at)
+
+    def test_heartbeat_thread_beats_until_the_handler_returns(self):
+        beaten = threading.Event()
+        job = mock.Mock(pk=1)
+        job.heartbeat.side_effect = beaten.set
+        with Heartbeat(job, interval=0.01):
+            self.assertTrue(beaten.wait(5))
+        calls = job.heartbeat.call_count
+        beaten.clear()
+        self.assertFalse(beaten.wait(0.05))
+        self.assertEqual(job.heartbeat.call_count, calls)
+
+    def test_abandoned_job_is_requeued_and_run_again(self):
+        job = enqueue("succeed", {"n": 1})
+        self.abandon(job, attempts=1)
+        with self.assertLogs("core.jobs", "WARNING"):
+            self.run_worker()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.STATUS_SUCCEEDED, 2))
+        self.assertEqual(job.result, {"echo": {"n": 1}})
+
+    def test_abandoned_job_fails_after_its_last_attempt(self):
+        job = enqueue("succeed")
+        self.abandon(job, attempts=2)
+        with self.assertLogs("core.jobs", "WARNING"):
+            self.assertEqual(requeue_stale_jobs(), (0, 1))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.STATUS_FAILED)
+        self.assertEqual(job.error, "The worker stopped while running this job.")
+        self.assertIsNotNone(job.finished_at)
+
+    def test_live_lease_is_left_alone(self):
+        job = enqueue("succeed")
+        claim_next_job()
+        self.assertEqual(requeue_stale_jobs(), (0, 0))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.STATUS_RUNNING)
+
+    def test_worker_records_outcomes(self):
+        succeeded, rejected, crashed = enqueue("succeed", {"n": 1}), enqueue("reject"), enqueue("crash")
+        with self.assertLogs("core.jobs", "ERROR"):
+            self.run_worker()
+        for job in (succeeded, rejected, crashed):
+            job.refresh_from_db()
+            self.assertIsNotNone(job.finished_at)
+        self.assertEqual((succeeded.status, succeeded.result), (Job.STATUS_SUCCEEDED, {"echo": {"n": 1}}))
+        self.assertEqual(
+            (rejected.status, rejected.error, rejected.result), (Job.STATUS_FAILED, "Rejected.", {"rows": 3})
+        )
+        self.assertEqual((crashed.status, crashed.error), (Job.STATUS_FAILED, "boom"))
@@ -0,0 +1,48 @@
+from importlib import import_module
+
+from django.apps import apps
+from django.test import TestCase
+
+from core.loadgen import seed_dataset
+from core.models import StudentExamSummary, SubjectExamAggregate
+
+backfill_summaries = import_module("core.migrations.0014_backfill_exam_summaries")
+backfill_aggregates = import_module("core.migrations.0015_backfill_subject_aggregates")
+
+
+class BackfillMigrationTests(TestCase):
+    """The data migrations rebuild what the services would for existing exams."""
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_dataset(classes=2, students=20, subjects=3, exams=2, seed=3)
+
+    def assertRebuilt(self, model, fields, backfill):
+        built = set(model.objects.values_list(*fields))
+        model.objects.all().delete()
+        backfill(apps, None)
+        self.assertEqual(set(model.objects.values_list(*fields)), built)
+
+    def test_exam_summaries(self):
+        self.assertRebuilt(
+            StudentExamSummary,
+            ("student_id", "exam_id", "total", "subject_count", "average", "average_grade", "rank"),
+            backfill_summaries.backfill_exam_summaries,
+        )
+
+    def test_subject_aggregates(self):
+        self.assertRebuilt(
+            SubjectExamAggregate,
+            (
+                "class_room_id",
+                "subject_id",
+                "exam_id",
+                "result_count",
+                "pass_count",
+                "total_marks",
+                "average",
+                "min_marks",
+                "max_marks",
+            ),
+            backfill_aggregates.backfill_subject_aggregates,
+        )
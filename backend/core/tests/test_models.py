@@ -0,0 +1,49 @@
+from unittest import mock
+
+from django.db import IntegrityError
+from django.test import TestCase
+
+from core.models import ClassRoom, RegistrationSequence, Student
+
+
+class RegistrationNumberTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.class_room = ClassRoom.objects.create(name="Form 1")
+
+    def setUp(self):
+        self.prefix = Student._reg_no_prefix()
+
+    def enrol(self, reg_no=None):
+        return Student.objects.create(
+            reg_no=reg_no, first_name="Pupil", last_name="One", gender="M", class_room=self.class_room
+        )
+
+    def counter(self):
+        return RegistrationSequence.objects.get(prefix=self.prefix).last_value
+
+    def test_reserve_hands_out_consecutive_blocks(self):
+        self.assertEqual(list(RegistrationSequence.reserve("T/", 3)), [1, 2, 3])
+        self.assertEqual(list(RegistrationSequence.reserve("T/", 2)), [4, 5])
+        self.assertEqual(list(RegistrationSequence.reserve("U/")), [1])
+
+    def test_students_are_numbered_in_order(self):
+        first, second = self.enrol(), self.enrol()
+        self.assertEqual((first.reg_no, second.reg_no), (f"{self.prefix}001", f"{self.prefix}002"))
+        self.assertEqual(Student.reserve_reg_nos(2), [f"{self.prefix}003", f"{self.prefix}004"])
+
+    def test_skips_numbers_typed_in_ahead_of_the_counter(self):
+        self.enrol()
+        self.enrol(f"{self.prefix}002")
+        self.enrol(f"{self.prefix}007")
+        # The block 002-003 collides, so the counter jumps past 007 and the
+        # retry's block starts at 008; 002-003 are burned.
+        self.assertEqual(Student.reserve_reg_nos(2), [f"{self.prefix}008", f"{self.prefix}009"])
+        self.assertEqual(self.counter(), 9)
+
+    def test_gives_up_after_the_retry_limit(self):
+        with mock.patch.object(Student, "_any_reg_no_taken", return_value=True) as taken:
+            with self.assertRaises(IntegrityError):
+                Student.reserve_reg_nos(2)
+        self.assertEqual(taken.call_count, Student.REG_NO_ATTEMPTS)
+        self.assertEqual(self.counter(), 2 * Student.REG_NO_ATTEMPTS)
@@ -0,0 +1,63 @@
+import warnings
+
+from django.contrib.auth import get_user_model
+from django.core.paginator import UnorderedObjectListWarning
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.models import ClassRoom, GradingScale, Student
+
+
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_superuser("cursor-admin", None, None)
+        class_rooms = [ClassRoom.objects.create(name=name) for name in ("Form 1", "Form 2")]
+        # Long runs of tied last names, across both classes, so pages break
+        # inside a tie and the cursor has to fall back on the id.
+        for index in range(23):
+            Student.objects.create(
+                first_name=f"Pupil {index}",
+                last_name=("Banda", "Mwita", "Banda", "Achieng")[index % 4],
+                gender="F",
+                class_room=class_rooms[index % 2],
+            )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def walk(self, url, params):
+        ids, pages = [], 0
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn("count", response.data)
+            ids.extend(row["id"] for row in response.data["results"])
+            pages += 1
+            if not response.data["next"]:
+                return ids, pages
+            response = self.client.get(response.data["next"])
+
+    def test_student_pages_neither_repeat_nor_skip_tied_rows(self):
+        ids, pages = self.walk(reverse("student-list"), {"pagination": "cursor", "page_size": 3})
+        expected = list(Student.objects.order_by("class_room_id", "last_name", "id").values_list("id", flat=True))
+        self.assertEqual(ids, expected)
+        self.assertEqual(pages, 8)
+
+    def test_invalid_cursor_is_not_found(self):
+        response = self.client.get(reverse("student-list"), {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, 404)
+
+
+class GradingScaleListTests(TestCase):
+    def test_list_is_ordered(self):
+        GradingScale.objects.create(name="Alpha")
+        client = APIClient()
+        client.force_authenticate(get_user_model().objects.create_superuser("scale-admin", None, None))
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", UnorderedObjectListWarning)
+            response = client.get(reverse("gradingscale-list"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([scale["name"] for scale in response.data["results"]], ["Alpha", "Standard"])
@@ -0,0 +1,315 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import get_resolver, reverse
+from rest_framework.test import APIClient
+
+from core.caching import (
+    GRADING_VERSION_KEY,
+    ROSTER_VERSION_KEY,
+    clear_local_versions,
+    exam_version_key,
+    get_version,
+)
+from core.grading import scale_cache
+from core.instrumentation import SqlTimer
+from core.loadgen import seed_dataset
+from core.models import GradingScale, Job, Role, Student, Subject, UserRole
+from core.permissions import clear_local_permission_codes, get_user_permission_codes
+
+SIZES = (10, 200)
+SUBJECTS = 8
+
+
+def endpoint(name, budget, method="get", args=(), query=None, data=None, fmt="json", status=200, grows=False):
+    """One request to measure; ``args``, ``query`` and ``data`` take the seeded context.
+
+    ``grows`` marks writes whose statements are batched, so their count may
+    rise with the roster as long as it stays within ``budget``.
+    """
+    return {
+        "name": name,
+        "budget": budget,
+        "grows": grows,
+        "method": method,
+        "args": args,
+        "query": query,
+        "data": data,
+        "format": fmt,
+        "status": status,
+    }
+
+
+def csv_upload(ctx):
+    header = "Reg no," + ",".join(subject.name for subject in ctx["subjects"])
+    lines = [header] + [
+        ",".join([student.reg_no] + ["55"] * len(ctx["subjects"])) for student in ctx["students"]
+    ]
+    return {"file": SimpleUploadedFile("results.csv", "\n".join(lines).encode("utf-8"))}
+
+
+# Reads run first; writes that publish or change data come last. The budget
+# is the most queries an endpoint may run at either roster size, and unless
+# marked ``grows`` the count must not rise with the roster. Budgets are for
+# the default database cache, where storing an entry takes five statements.
+ENDPOINTS = [
+    endpoint("api-root", 0),
+    endpoint("classroom-list", 2),
+    endpoint("classroom-detail", 1, args=lambda ctx: [ctx["class_room"].id]),
+    endpoint("student-list", 2, query=lambda ctx: {"class_room": ctx["class_room"].id}),
+    endpoint("student-list", 1, query=lambda ctx: {"class_room": ctx["class_room"].id, "pagination": "cursor"}),
+    endpoint("student-detail", 1, args=lambda ctx: [ctx["student"].id]),
+    endpoint("subject-list", 2, query=lambda ctx: {"class_room": ctx["class_room"].id}),
+    endpoint("subject-detail", 1, args=lambda ctx: [ctx["subject"].id]),
+    endpoint("exam-list", 2),
+    endpoint("exam-detail", 1, args=lambda ctx: [ctx["exam"].id]),
+    endpoint("gradingscale-list", 3),
+    endpoint("gradingscale-detail", 2, args=lambda ctx: [ctx["scale"].id]),
+    endpoint("result-list", 1, query=lambda ctx: {"exam": ctx["exam"].id, "class_room": ctx["class_room"].id}),
+    endpoint(
+        "student-results",
+        5,
+        args=lambda ctx: [ctx["student"].id],
+        query=lambda ctx: {"exam_id": ctx["exam"].id},
+    ),
+    endpoint(
+        "class-results", 3, args=lambda ctx: [ctx["class_room"].id], query=lambda ctx: {"exam_id": ctx["exam"].id}
+    ),
+    endpoint(
+        "class-result-sheet",
+        13,
+        args=lambda ctx: [ctx["class_room"].id],
+        query=lambda ctx: {"exam_id": ctx["exam"].id},
+    ),
+    endpoint(
+        "class-result-csv-template",
+        12,
+        args=lambda ctx: [ctx["class_room"].id],
+        query=lambda ctx: {"exam_id": ctx["exam"].id},
+    ),
+    endpoint(
+        "subject-result-sheet",
+        5,
+        args=lambda ctx: [ctx["subject"].id],
+        query=lambda ctx: {"exam_id": ctx["exam"].id},
+    ),
+    endpoint("report-card", 6, args=lambda ctx: [ctx["student"].id, ctx["exam"].id]),
+    endpoint("class-report-cards", 5, args=lambda ctx: [ctx["class_room"].id, ctx["exam"].id]),
+    endpoint("analytics", 7, args=lambda ctx: [ctx["class_room"].id], query=lambda ctx: {"exam_id": ctx["exam"].id}),
+    endpoint(
+        "analytics-extended",
+        6,
+        args=lambda ctx: [ctx["class_room"].id],
+        query=lambda ctx: {"exam_id": ctx["exam"].id},
+    ),
+    endpoint("analytics-trends", 6, args=lambda ctx: [ctx["class_room"].id]),
+    endpoint("job-detail", 1, args=lambda ctx: [ctx["job"].id]),
+    endpoint("job-result", 1, args=lambda ctx: [ctx["job"].id]),
+    endpoint("metrics", 0, status=403),
+    endpoint(
+        "result-upload",
+        21,
+        method="post",
+        data=lambda ctx: {
+            "student": ctx["student"].id,
+            "subject": ctx["spare_subject"].id,
+            "exam": ctx["exam"].id,
+            "marks": "64.5",
+        },
+        status=201,
+    ),
+    endpoint(
+        "result-bulk-upload",
+        24,
+        method="post",
+        status=201,
+        grows=True,
+        data=lambda ctx: {
+            "results": [
+                {"student": student.id, "subject": ctx["subject"].id, "exam": ctx["exam"].id, "marks": "71"}
+                for student in ctx["students"]
+            ]
+        },
+    ),
+    endpoint(
+        "subject-result-sheet",
+        23,
+        method="post",
+        grows=True,
+        args=lambda ctx: [ctx["subject"].id],
+        query=lambda ctx: {"exam_id": ctx["exam"].id},
+        data=lambda ctx: {
+            "rows": [{"student_id": student.id, "marks": "48"} for student in ctx["students"]]
+        },
+    ),
+    endpoint(
+        "class-result-csv-import",
+        39,
+        method="post",
+        grows=True,
+        args=lambda ctx: [ctx["class_room"].id],
+        query=lambda ctx: {"exam_id": ctx["exam"].id},
+        data=csv_upload,
+        fmt="multipart",
+    ),
+    endpoint(
+        "student-bulk-enrol",
+        8,
+        method="post",
+        grows=True,
+        data=lambda ctx: {
+            "students": [
+                {"full_name": f"New Student {index}", "gender": "F", "class": ctx["class_room"].name}
+                for index in range(len(ctx["students"]))
+            ]
+        },
+        status=201,
+    ),
+    endpoint("publish-student-result", 8, method="post", args=lambda ctx: [ctx["exam"].id, ctx["student"].id]),
+    endpoint("publish-exam", 18, method="post", args=lambda ctx: [ctx["other_exam"].id]),
+    endpoint(
+        "public-class-result-sheet",
+        3,
+        args=lambda ctx: [ctx["class_room"].id],
+        query=lambda ctx: {"exam_id": ctx["other_exam"].id},
+    ),
+]
+
+
+class QueryBudgetTests(TestCase):
+    """Call every core API route against a small and a large seeded class and
+    fail when a query count grows with the roster or exceeds its budget."""
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command("seed_roles", stdout=StringIO())
+
+    def test_every_route_has_a_budget(self):
+        names = set()
+        patterns = list(get_resolver("core.urls").url_patterns)
+        while patterns:
+            pattern = patterns.pop()
+            if hasattr(pattern, "url_patterns"):
+                patterns.extend(pattern.url_patterns)
+            elif pattern.name:
+                names.add(pattern.name)
+        self.assertEqual(names - {item["name"] for item in ENDPOINTS}, set(), "Routes without a query budget")
+
+    def test_superuser_within_budget(self):
+        self.assertWithinBudget(
+            lambda size: get_user_model().objects.create_superuser(f"budget-admin-{size}", None, None)
+        )
+
+    def test_role_user_within_budget(self):
+        # A user whose permissions come from a role, so every request goes
+        # through HasPermission and the cached permission set.
+        def role_user(size):
+            user = get_user_model().objects.create_user(f"budget-role-{size}")
+            UserRole.objects.create(user=user, role=Role.objects.get(name="Admin"))
+            return user
+
+        self.assertWithinBudget(role_user)
+
+    def test_warm_permission_check_runs_no_queries(self):
+        user = get_user_model().objects.create_user("budget-cold")
+        UserRole.objects.create(user=user, role=Role.objects.get(name="Teacher"))
+        self.forget_cache()
+        codes = get_user_permission_codes(self.fresh(user))
+        self.assertIn("upload_result", codes)
+        user = self.fresh(user)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_user_permission_codes(user), codes)
+        # Another process finds the version and the set in the shared cache.
+        clear_local_versions()
+        clear_local_permission_codes()
+        user = self.fresh(user)
+        with self.assertNumQueries(2):
+            self.assertEqual(get_user_permission_codes(user), codes)
+        # A role change in this process is seen by the next check.
+        with self.captureOnCommitCallbacks(execute=True):
+            UserRole.objects.create(user=user, role=Role.objects.get(name="Admin"))
+        self.assertIn("manage_users", get_user_permission_codes(self.fresh(user)))
+
+    @staticmethod
+    def forget_cache():
+        cache.clear()
+        clear_local_versions()
+        clear_local_permission_codes()
+        scale_cache.clear()
+
+    @staticmethod
+    def fresh(user):
+        return get_user_model().objects.get(pk=user.pk)
+
+    def assertWithinBudget(self, make_user):
+        small, large = SIZES
+        counts = {size: self.measure(size, make_user(size)) for size in SIZES}
+        for index, item in enumerate(ENDPOINTS):
+            (small_count, small_status), (large_count, large_status) = counts[small][index], counts[large][index]
+            with self.subTest(endpoint=item["name"], method=item["method"].upper(), counts=(small_count, large_count)):
+                self.assertEqual((small_status, large_status), (item["status"], item["status"]))
+                if not item["grows"]:
+                    self.assertLessEqual(large_count, small_count, "Query count grows with the roster")
+                self.assertLessEqual(max(small_count, large_count), item["budget"], "Over budget")
+
+    def measure(self, size, user):
+        # Every run starts equally cold on the configured cache backend, with
+        # no cached sheets, versions or permission sets from the last size.
+        # Versions are held for the whole run: re-reading them once per TTL
+        # is not a per-request cost.
+        self.forget_cache()
+        with override_settings(CACHE_VERSION_TTL=3600, REPORT_CARD_CACHE_MAX_BYTES=0, REPORT_CARD_WORKERS=1):
+            return self.run_endpoints(size, user)
+
+    def run_endpoints(self, size, user):
+        class_rooms, exams = seed_dataset(students=size, subjects=SUBJECTS, exams=2, seed=size)
+        students = list(Student.objects.filter(class_room=class_rooms[0]).order_by("id"))
+        spare_subject = Subject.objects.create(name="Spare", code="SPARE", class_room=class_rooms[0])
+        subjects = list(Subject.objects.filter(class_room=class_rooms[0]).order_by("name"))
+        ctx = {
+            "class_room": class_rooms[0],
+            "exam": exams[0],
+            "other_exam": exams[1],
+            "students": students,
+            "student": students[0],
+            "subjects": subjects,
+            "subject": subjects[0],
+            "spare_subject": spare_subject,
+            "scale": GradingScale.objects.create(name=f"query-budget-{size}"),
+            "job": Job.objects.create(
+                kind="class_result_csv_import", status=Job.STATUS_SUCCEEDED, result={}, created_by=user
+            ),
+        }
+        # Warm the shared versions and permission cache once, as they would
+        # be in steady state; test_warm_permission_check_runs_no_queries
+        # covers the permission miss itself.
+        for key in [ROSTER_VERSION_KEY, GRADING_VERSION_KEY] + [exam_version_key(exam.id) for exam in exams]:
+            get_version(key)
+        get_user_permission_codes(self.fresh(user))
+        client = APIClient()
+        counts = []
+        for item in ENDPOINTS:
+            # A fresh instance per request, like authentication loads, so the
+            # permission set comes from the cache, not the memoized object.
+            client.force_authenticate(self.fresh(user))
+            args = item["args"](ctx) if callable(item["args"]) else item["args"]
+            url = reverse(item["name"], args=args)
+            query = item["query"](ctx) if item["query"] else {}
+            data = item["data"](ctx) if item["data"] else None
+            sql = SqlTimer()
+            with connection.execute_wrapper(sql):
+                if item["method"] == "get":
+                    response = client.get(url, query)
+                else:
+                    if query:
+                        url = f"{url}?{'&'.join(f'{key}={value}' for key, value in query.items())}"
+                    response = getattr(client, item["method"])(url, data, format=item["format"])
+                if getattr(response, "streaming", False):
+                    b"".join(response.streaming_content)
+            counts.append((sql.count, response.status_code))
+        return counts
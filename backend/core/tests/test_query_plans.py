@@ -0,0 +1,95 @@
+import re
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from core.analytics import class_statistics
+from core.loadgen import seed_dataset
+from core.models import Result, Student, StudentExamSummary, Subject
+from core.reports import class_report_cards, report_card_data
+from core.services import (
+    analytics_for_class,
+    build_class_result_sheet,
+    performance_trends,
+    refresh_exam_summaries,
+    result_validators,
+)
+
+RESULT_TABLE = re.compile(r"\bcore_result\b")
+EXPLAIN = {"postgresql": "EXPLAIN", "sqlite": "EXPLAIN QUERY PLAN"}
+SEQUENTIAL_SCAN = {
+    "postgresql": re.compile(r"Seq Scan on core_result\b"),
+    "sqlite": re.compile(r"\bSCAN core_result\b(?! USING)"),
+}
+
+
+class ResultQueryPlanTests(TestCase):
+    """EXPLAIN every query the hot result paths run against ``core_result``
+    and fail if any of them needs a sequential scan."""
+
+    @classmethod
+    def setUpTestData(cls):
+        class_rooms, exams = seed_dataset(classes=2, students=200, subjects=8, exams=2, seed=1)
+        cls.class_room, cls.exam = class_rooms[0], exams[0]
+        cls.student = Student.objects.filter(class_room=cls.class_room).first()
+        cls.subject = Subject.objects.filter(class_room=cls.class_room).first()
+
+    def setUp(self):
+        self.sequential_scan = SEQUENTIAL_SCAN.get(connection.vendor)
+        if self.sequential_scan is None:
+            self.skipTest(f"Query plan checks are not supported on {connection.vendor}.")
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                # Tiny test tables are cheapest to scan; rule that out so a
+                # sequential scan can only mean no usable index exists.
+                cursor.execute("SET LOCAL enable_seqscan = off")
+
+    def assertNoSequentialScan(self, workload):
+        with CaptureQueriesContext(connection) as captured:
+            workload()
+        queries = [
+            query["sql"]
+            for query in captured.captured_queries
+            if query["sql"].lstrip().upper().startswith("SELECT") and RESULT_TABLE.search(query["sql"])
+        ]
+        for sql in queries:
+            with connection.cursor() as cursor:
+                cursor.execute(f"{EXPLAIN[connection.vendor]} {sql}")
+                plan = "\n".join(" ".join(str(column) for column in row) for row in cursor.fetchall())
+            self.assertIsNone(self.sequential_scan.search(plan), f"Sequential scan on core_result:\n{sql}\n{plan}")
+
+    def test_class_result_sheet(self):
+        self.assertNoSequentialScan(lambda: build_class_result_sheet(self.class_room, self.exam))
+
+    def test_analytics(self):
+        self.assertNoSequentialScan(lambda: analytics_for_class(self.class_room, self.exam))
+
+    def test_extended_analytics(self):
+        self.assertNoSequentialScan(lambda: class_statistics(self.class_room, self.exam))
+
+    def test_performance_trends(self):
+        self.assertNoSequentialScan(lambda: performance_trends(self.class_room, self.student.id))
+
+    def test_class_report_cards(self):
+        self.assertNoSequentialScan(lambda: class_report_cards(self.class_room, self.exam))
+
+    def test_student_report_card(self):
+        self.assertNoSequentialScan(
+            lambda: report_card_data(
+                self.student,
+                self.exam,
+                list(Result.objects.filter(student=self.student, exam=self.exam).select_related("subject")),
+                StudentExamSummary.objects.filter(student=self.student, exam=self.exam).first(),
+            )
+        )
+
+    def test_student_results(self):
+        results = Result.objects.filter(student=self.student, exam=self.exam)
+        self.assertNoSequentialScan(lambda: (result_validators(results), list(results)))
+
+    def test_subject_result_sheet(self):
+        self.assertNoSequentialScan(lambda: list(Result.objects.filter(exam=self.exam, subject=self.subject)))
+
+    def test_summary_refresh(self):
+        self.assertNoSequentialScan(lambda: refresh_exam_summaries(self.exam.id, [self.student.id]))
@@ -0,0 +1,194 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from core import services
+from core.models import ClassRoom, Exam, Result, Student, StudentExamSummary, Subject, SubjectExamAggregate
+from core.services import calculate_rankings, import_class_results_csv, refresh_exam_summaries, upsert_results
+
+
+class ResultWriteTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.class_room = ClassRoom.objects.create(name="Form 1")
+        cls.subjects = [
+            Subject.objects.create(name=name, code=name[:3].upper(), class_room=cls.class_room)
+            for name in ("English", "Maths")
+        ]
+        cls.students = [
+            Student.objects.create(
+                reg_no=f"T{index:03d}", first_name="Pupil", last_name=str(index), gender="F", class_room=cls.class_room
+            )
+            for index in range(5)
+        ]
+        cls.exam = Exam.objects.create(name="Midterm", term="Term 1", year=2024, class_room=cls.class_room)
+
+    def upload_marks(self, marks_by_student, subjects=None):
+        """Upsert ``marks`` for each student index in every subject."""
+        return upsert_results(
+            (self.students[index].id, subject.id, self.exam.id, Decimal(marks))
+            for index, marks in marks_by_student.items()
+            for subject in subjects or self.subjects
+        )
+
+    def summaries(self):
+        return {
+            summary.student_id: (summary.total, summary.rank)
+            for summary in StudentExamSummary.objects.filter(exam=self.exam)
+        }
+
+
+class UpsertResultsTests(ResultWriteTestCase):
+    def test_counts_created_and_updated_rows(self):
+        self.assertEqual(self.upload_marks({0: 50, 1: 60}), (4, 0))
+        self.assertEqual(self.upload_marks({1: 65, 2: 70, 3: 80}), (4, 2))
+        self.assertEqual(Result.objects.filter(exam=self.exam).count(), 8)
+
+    def test_repeated_entries_count_as_updates(self):
+        english = self.subjects[0]
+        entries = [
+            (self.students[0].id, english.id, self.exam.id, Decimal("40")),
+            (self.students[0].id, english.id, self.exam.id, Decimal("45")),
+        ]
+        self.assertEqual(upsert_results(entries), (1, 1))
+        self.assertEqual(Result.objects.get(student=self.students[0], subject=english).marks, Decimal("45"))
+
+    def test_reupload_updates_marks_and_grade_in_place(self):
+        self.upload_marks({0: 35})
+        before = dict(Result.objects.filter(student=self.students[0]).values_list("subject_id", "id"))
+        self.assertEqual(set(Result.objects.filter(student=self.students[0]).values_list("grade", flat=True)), {"D"})
+        self.assertEqual(self.upload_marks({0: 85}), (0, 2))
+        after = Result.objects.filter(student=self.students[0])
+        self.assertEqual(dict(after.values_list("subject_id", "id")), before)
+        self.assertEqual(set(after.values_list("marks", "grade")), {(Decimal("85"), "A")})
+        self.assertEqual(self.summaries()[self.students[0].id], (Decimal("170"), 1))
+
+
+class ClassResultCsvImportTests(ResultWriteTestCase):
+    def upload(self, marks):
+        lines = ["Reg no,English,Maths"] + [
+            f"{student.reg_no},{mark},{mark}" for student, mark in zip(self.students, marks)
+        ]
+        return SimpleUploadedFile("results.csv", "\n".join(lines).encode("utf-8"))
+
+    def test_refreshes_derived_data_once_after_every_batch(self):
+        refresh = mock.patch.object(services, "refresh_exam_summaries", wraps=services.refresh_exam_summaries)
+        with mock.patch.object(services, "CSV_IMPORT_BATCH_SIZE", 2), refresh as refreshed:
+            ok, data = import_class_results_csv(self.class_room, self.exam, self.upload([50, 70, 70, 40, 90]), None)
+        self.assertTrue(ok, data)
+        self.assertEqual(data, {"created": 10, "updated": 0, "total": 10})
+        refreshed.assert_called_once()
+        self.assertEqual(set(refreshed.call_args.args[1]), {student.id for student in self.students})
+        self.assertEqual(
+            self.summaries(),
+            {
+                self.students[0].id: (Decimal("100"), 4),
+                self.students[1].id: (Decimal("140"), 2),
+                self.students[2].id: (Decimal("140"), 2),
+                self.students[3].id: (Decimal("80"), 5),
+                self.students[4].id: (Decimal("180"), 1),
+            },
+        )
+        self.assertEqual(SubjectExamAggregate.objects.filter(exam=self.exam).count(), 2)
+
+    def test_invalid_row_rolls_back_every_batch(self):
+        with mock.patch.object(services, "CSV_IMPORT_BATCH_SIZE", 2):
+            ok, data = import_class_results_csv(self.class_room, self.exam, self.upload([50, 70, 70, 40, 101]), None)
+        self.assertFalse(ok)
+        self.assertEqual(
+            data["errors"],
+            [
+                {"row": 6, "error": "Marks out of range for English."},
+                {"row": 6, "error": "Marks out of range for Maths."},
+            ],
+        )
+        self.assertEqual(self.summaries(), {})
+
+
+class SummaryRefreshTests(ResultWriteTestCase):
+    def full_rebuild(self):
+        StudentExamSummary.objects.filter(exam=self.exam).delete()
+        refresh_exam_summaries(self.exam.id)
+        return self.summary_rows()
+
+    def summary_rows(self):
+        return set(
+            StudentExamSummary.objects.filter(exam=self.exam).values_list(
+                "student_id", "total", "subject_count", "average", "average_grade", "rank"
+            )
+        )
+
+    def test_incremental_refresh_matches_full_rebuild(self):
+        self.upload_marks({0: 60, 1: 75, 2: 75, 3: 40, 4: 90})
+        # Moves one student into a tie at the top and another below it.
+        self.upload_marks({0: 90, 3: 30})
+        incremental = self.summary_rows()
+        self.assertEqual(
+            self.summaries(),
+            {
+                self.students[0].id: (Decimal("180"), 1),
+                self.students[1].id: (Decimal("150"), 3),
+                self.students[2].id: (Decimal("150"), 3),
+                self.students[3].id: (Decimal("60"), 5),
+                self.students[4].id: (Decimal("180"), 1),
+            },
+        )
+        self.assertEqual(incremental, self.full_rebuild())
+
+    def test_refresh_after_delete_matches_full_rebuild(self):
+        self.upload_marks({0: 60, 1: 75, 2: 80, 3: 40, 4: 90})
+        with self.captureOnCommitCallbacks(execute=True):
+            # One subject less ties two students; another loses every result.
+            Result.objects.filter(student=self.students[2], subject=self.subjects[1]).delete()
+            Result.objects.filter(student=self.students[3]).delete()
+        after_delete = self.summary_rows()
+        self.assertEqual(
+            self.summaries(),
+            {
+                self.students[0].id: (Decimal("120"), 3),
+                self.students[1].id: (Decimal("150"), 2),
+                self.students[2].id: (Decimal("80"), 4),
+                self.students[4].id: (Decimal("180"), 1),
+            },
+        )
+        self.assertEqual(after_delete, self.full_rebuild())
+
+    def test_locks_the_exam_before_ranking(self):
+        if not connection.features.has_select_for_update:
+            self.skipTest(f"{connection.vendor} has no row locks.")
+        with CaptureQueriesContext(connection) as captured:
+            refresh_exam_summaries(self.exam.id)
+        queries = [query["sql"] for query in captured.captured_queries if query["sql"].startswith("SELECT")]
+        self.assertIn('FROM "core_exam"', queries[0])
+        self.assertIn("FOR UPDATE", queries[0])
+
+
+class RankingTests(ResultWriteTestCase):
+    def test_matches_summary_ranks_with_ties(self):
+        self.upload_marks({0: 60, 1: 75, 2: 75, 3: 40, 4: 90})
+        results = Result.objects.filter(exam=self.exam)
+        self.assertEqual(
+            calculate_rankings(results),
+            {student_id: rank for student_id, (_, rank) in self.summaries().items()},
+        )
+
+    def test_ranks_restart_within_each_partition(self):
+        self.upload_marks({0: 60, 1: 75, 2: 75}, subjects=self.subjects[:1])
+        self.upload_marks({0: 80, 1: 70, 2: 80}, subjects=self.subjects[1:])
+        english, maths = (subject.id for subject in self.subjects)
+        first, second, third = (student.id for student in self.students[:3])
+        self.assertEqual(
+            calculate_rankings(Result.objects.filter(exam=self.exam), partition_by=("subject_id",)),
+            {
+                (first, english): 3,
+                (second, english): 1,
+                (third, english): 1,
+                (first, maths): 1,
+                (second, maths): 3,
+                (third, maths): 1,
+            },
+        )
@@ -0,0 +1,53 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.loadgen import seed_dataset
+from core.models import Student, Subject
+
+
+class ConditionalResultTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        class_rooms, exams = seed_dataset(students=5, subjects=2, seed=7)
+        cls.class_room, cls.exam = class_rooms[0], exams[0]
+        cls.student = Student.objects.filter(class_room=cls.class_room).first()
+        cls.subject = Subject.objects.filter(class_room=cls.class_room).first()
+        cls.user = get_user_model().objects.create_superuser("etag-admin", None, None)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get(self, name, arg, **headers):
+        return self.client.get(reverse(name, args=[arg]), {"exam_id": self.exam.id}, **headers)
+
+    def write_result(self, marks):
+        result = {"student": self.student.id, "subject": self.subject.id, "exam": self.exam.id, "marks": marks}
+        response = self.client.post(reverse("result-bulk-upload"), {"results": [result]}, format="json")
+        self.assertEqual(response.status_code, 201)
+
+    def assertConditional(self, name, arg):
+        first = self.get(name, arg)
+        self.assertEqual(first.status_code, 200)
+        etag = first["ETag"]
+
+        cached = self.get(name, arg, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached["ETag"], etag)
+        self.assertEqual(cached.content, b"")
+
+        self.write_result("12.5")
+        changed = self.get(name, arg, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed["ETag"], etag)
+
+    def test_student_results(self):
+        self.assertConditional("student-results", self.student.id)
+
+    def test_class_result_sheet(self):
+        self.assertConditional("class-result-sheet", self.class_room.id)
+
+    def test_analytics(self):
+        self.assertConditional("analytics", self.class_room.id)
@@ -2,23 +2,31 @@ from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
 from .views import (
+    AnalyticsExtendedView,
     AnalyticsView,
     ClassResultCsvImportView,
     ClassResultCsvTemplateView,
     PublicClassResultSheetView,
     ClassResultView,
     ClassResultSheetView,
+    ClassReportCardsView,
     ClassRoomViewSet,
     ExamViewSet,
+    GradingScaleViewSet,
+    JobResultView,
+    JobView,
+    PerformanceTrendsView,
     PublishExamView,
     PublishStudentResultView,
     ReportCardPdfView,
     ResultBulkUploadView,
+    ResultListView,
     ResultUploadView,
     SubjectResultSheetView,
     StudentResultView,
     StudentViewSet,
     SubjectViewSet,
+    metrics_view,
 )
 
 router = DefaultRouter()
@@ -26,9 +34,11 @@ router.register("classes", ClassRoomViewSet)
 router.register("students", StudentViewSet)
 router.register("subjects", SubjectViewSet)
 router.register("exams", ExamViewSet)
+router.register("grading-scales", GradingScaleViewSet)
 
 urlpatterns = [
     path("", include(router.urls)),
+    path("results/", ResultListView.as_view(), name="result-list"),
     path("results/upload/", ResultUploadView.as_view(), name="result-upload"),
     path("results/bulk-upload/", ResultBulkUploadView.as_view(), name="result-bulk-upload"),
     path("results/student/<int:student_id>/", StudentResultView.as_view(), name="student-results"),
@@ -69,5 +79,23 @@ urlpatterns = [
         ReportCardPdfView.as_view(),
         name="report-card",
     ),
+    path(
+        "report-cards/class/<int:class_id>/<int:exam_id>/",
+        ClassReportCardsView.as_view(),
+        name="class-report-cards",
+    ),
     path("analytics/class/<int:class_id>/", AnalyticsView.as_view(), name="analytics"),
+    path(
+        "analytics/class/<int:class_id>/extended/",
+        AnalyticsExtendedView.as_view(),
+        name="analytics-extended",
+    ),
+    path(
+        "analytics/class/<int:class_id>/trends/",
+        PerformanceTrendsView.as_view(),
+        name="analytics-trends",
+    ),
+    path("jobs/<int:job_id>/", JobView.as_view(), name="job-detail"),
+    path("jobs/<int:job_id>/result/", JobResultView.as_view(), name="job-result"),
+    path("metrics/", metrics_view, name="metrics"),
 ]
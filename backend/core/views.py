@@ -1,43 +1,170 @@
 import csv
+import json
+import os
 from decimal import Decimal
+from functools import partial
 from io import BytesIO, StringIO
+from itertools import islice
 
 from django.conf import settings
+from django.contrib.auth import get_user_model
 from django.db import transaction
-from django.db.models import Avg, Sum
-from django.http import FileResponse, HttpResponse
+from django.db.models import Avg, ProtectedError, Q
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
-from rest_framework import status, viewsets
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.crypto import constant_time_compare
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.http import require_GET
+from rest_framework import generics, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
 from rest_framework.views import APIView
 
-from .models import ClassRoom, Exam, Result, ResultPublication, Student, Subject
+from .analytics import class_statistics
+from .authentication import PermissionClaimsUser
+from .caching import ROSTER_VERSION_KEY, get_version
+from .grading import scale_for_exam
+from .jobs import enqueue
+from .metrics import render_metrics
+from .models import (
+    ClassRoom,
+    Exam,
+    GradingScale,
+    Job,
+    Result,
+    ResultPublication,
+    Student,
+    StudentExamSummary,
+    Subject,
+)
+from .pagination import KeysetPaginationMixin
 from .permissions import HasPermission, get_user_permission_codes
+from .reports import (
+    class_report_cards,
+    render_report_card,
+    render_report_cards,
+    report_card_cache,
+    report_card_cache_key,
+    report_card_data,
+    stream_zip,
+)
 from .serializers import (
     BulkResultUploadSerializer,
     ClassRoomSerializer,
     ExamSerializer,
+    GradingScaleSerializer,
+    JobSerializer,
+    ResultRowSerializer,
     ResultSerializer,
+    StudentEnrolmentSerializer,
+    StudentRowSerializer,
     StudentSerializer,
     SubjectSerializer,
     UserSerializer,
 )
 from .services import (
     analytics_for_class,
-    build_class_result_sheet,
-    calculate_rankings,
-    grade_for_marks,
+    cached_class_result_sheet,
+    enrol_students,
+    exams_graded_by,
+    import_class_results_csv,
     is_result_published,
-    remarks_for_grade,
+    mask_class_result_sheet,
+    normalize_enrolment_row,
+    performance_trends,
+    ranked_totals,
+    read_enrolment_csv,
+    regrade_exams,
+    result_validators,
+    upsert_results,
+)
+from .snapshots import (
+    create_result_snapshot,
+    published_report_cards,
+    published_snapshot,
+    snapshot_content,
+    snapshot_validators,
 )
 
 
+def enrolment_error_message(errors):
+    messages = []
+    for field, field_errors in errors.items():
+        text = " ".join(str(error) for error in field_errors)
+        messages.append(text if field == "non_field_errors" else f"{field}: {text}")
+    return "; ".join(messages)
+
+
+def wants_async(request):
+    return request.query_params.get("async", "").lower() in ("1", "true", "yes")
+
+
+def job_accepted(job):
+    return Response(
+        {
+            "job_id": job.id,
+            "status": job.status,
+            "status_url": reverse("job-detail", args=[job.id]),
+        },
+        status=status.HTTP_202_ACCEPTED,
+    )
+
+
+class ConditionalResultMixin:
+    """Answer ``If-None-Match``/``If-Modified-Since`` with 304 before any heavy work."""
+
+    etag = None
+    last_modified = None
+
+    def not_modified(self, request, results, *extra):
+        return self.check_validators(request, *result_validators(results, *extra))
+
+    def check_validators(self, request, etag, last_modified):
+        self.etag, self.last_modified = etag, last_modified
+        return get_conditional_response(
+            request,
+            etag=quote_etag(self.etag),
+            last_modified=int(self.last_modified.timestamp()) if self.last_modified else None,
+        )
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if self.etag and response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            response["ETag"] = quote_etag(self.etag)
+            if self.last_modified:
+                response["Last-Modified"] = http_date(self.last_modified.timestamp())
+            patch_cache_control(response, no_cache=True)
+        return response
+
+
+class RowSerializerListMixin:
+    """Serve ``list`` through ``row_serializer_class`` on ``values()`` rows.
+
+    Detail and write actions keep the model serializer.
+    """
+
+    row_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        serializer_class = self.row_serializer_class
+        rows = serializer_class.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(serializer_class(page).data)
+        return Response(serializer_class(rows).data)
+
+
 class CurrentUserView(APIView):
     def get(self, request):
-        return Response(UserSerializer(request.user).data)
+        user = request.user
+        if isinstance(user, PermissionClaimsUser):
+            user = get_object_or_404(get_user_model(), pk=user.id)
+        return Response(UserSerializer(user).data)
 
 
 class ClassRoomViewSet(viewsets.ModelViewSet):
@@ -47,13 +174,22 @@ class ClassRoomViewSet(viewsets.ModelViewSet):
     permission_classes = [HasPermission]
     search_fields = ["name"]
 
+    def perform_update(self, serializer):
+        previous_scale_id = serializer.instance.grading_scale_id
+        with transaction.atomic():
+            class_room = serializer.save()
+            if class_room.grading_scale_id != previous_scale_id:
+                regrade_exams(Exam.objects.filter(class_room=class_room))
+
 
-class StudentViewSet(viewsets.ModelViewSet):
+class StudentViewSet(KeysetPaginationMixin, RowSerializerListMixin, viewsets.ModelViewSet):
     queryset = Student.objects.all()
     serializer_class = StudentSerializer
+    row_serializer_class = StudentRowSerializer
     required_permission = "crud_student"
     permission_classes = [HasPermission]
     search_fields = ["first_name", "last_name", "reg_no"]
+    keyset_ordering = ("class_room", "last_name", "id")
 
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -65,8 +201,44 @@ class StudentViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(reg_no=reg_no)
         return queryset
 
+    @action(detail=False, methods=["post"], url_path="bulk-enrol")
+    def bulk_enrol(self, request):
+        upload = request.FILES.get("file")
+        if upload:
+            rows, first_row = read_enrolment_csv(upload), 2
+        else:
+            data = request.data.get("students") if isinstance(request.data, dict) else request.data
+            if not isinstance(data, list):
+                return Response(
+                    {"detail": "Provide a CSV file or a list of students."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            rows = [normalize_enrolment_row(row) if isinstance(row, dict) else {} for row in data]
+            first_row = 1
+        if not rows:
+            return Response({"detail": "No students to enrol."}, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = StudentEnrolmentSerializer(data=rows, many=True)
+        if serializer.is_valid():
+            students, errors = enrol_students(serializer.validated_data, first_row)
+        else:
+            errors = [
+                {"row": index, "error": enrolment_error_message(row_errors)}
+                for index, row_errors in enumerate(serializer.errors, start=first_row)
+                if row_errors
+            ]
+        if errors:
+            return Response(
+                {"detail": "Validation errors in enrolment.", "errors": errors},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(
+            {"created": len(students), "students": StudentSerializer(students, many=True).data},
+            status=status.HTTP_201_CREATED,
+        )
+
 
-class SubjectViewSet(viewsets.ModelViewSet):
+class SubjectViewSet(KeysetPaginationMixin, viewsets.ModelViewSet):
     queryset = Subject.objects.all()
     serializer_class = SubjectSerializer
     required_permission = "crud_subject"
@@ -84,13 +256,53 @@ class SubjectViewSet(viewsets.ModelViewSet):
         return queryset
 
 
-class ExamViewSet(viewsets.ModelViewSet):
+class ExamViewSet(KeysetPaginationMixin, viewsets.ModelViewSet):
     queryset = Exam.objects.all()
     serializer_class = ExamSerializer
     required_permission = "publish_result"
     permission_classes = [HasPermission]
     search_fields = ["name", "term", "year"]
 
+    def perform_update(self, serializer):
+        previous_scale_id = serializer.instance.grading_scale_id
+        with transaction.atomic():
+            exam = serializer.save()
+            if exam.grading_scale_id != previous_scale_id:
+                regrade_exams(Exam.objects.filter(id=exam.id))
+
+
+class GradingScaleViewSet(viewsets.ModelViewSet):
+    """Grading scales; every change regrades the unpublished results graded by the scale."""
+
+    queryset = GradingScale.objects.prefetch_related("boundaries").order_by("name", "id")
+    serializer_class = GradingScaleSerializer
+    required_permission = "manage_grading"
+    permission_classes = [HasPermission]
+    search_fields = ["name"]
+
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            scale = serializer.save()
+            if scale.is_default:
+                regrade_exams(exams_graded_by([scale.id], include_default=True))
+
+    def perform_update(self, serializer):
+        was_default = serializer.instance.is_default
+        with transaction.atomic():
+            scale = serializer.save()
+            regrade_exams(exams_graded_by([scale.id], include_default=was_default or scale.is_default))
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            exam_ids = list(
+                exams_graded_by([instance.id], include_default=instance.is_default).values_list("id", flat=True)
+            )
+            try:
+                instance.delete()
+            except ProtectedError:
+                raise ValidationError({"detail": "Exams still use this grading scale; assign them another first."})
+            regrade_exams(Exam.objects.filter(id__in=exam_ids))
+
 
 class ResultUploadView(APIView):
     permission_classes = [HasPermission]
@@ -110,41 +322,50 @@ class ResultBulkUploadView(APIView):
     def post(self, request):
         serializer = BulkResultUploadSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        created = []
-        created_count = 0
-        updated_count = 0
-        for item in serializer.validated_data["results"]:
-            exam = Exam.objects.get(id=item["exam"])
-            student = Student.objects.get(id=item["student"])
-            subject = Subject.objects.get(id=item["subject"])
+        items = serializer.validated_data["results"]
+        exams = Exam.objects.in_bulk({item["exam"] for item in items})
+        students = Student.objects.in_bulk({item["student"] for item in items})
+        subjects = Subject.objects.in_bulk({item["subject"] for item in items})
+        published = set(
+            ResultPublication.objects.filter(exam_id__in=exams, student_id__in=students).values_list(
+                "student_id", "exam_id"
+            )
+        )
+        for item in items:
+            exam = exams.get(item["exam"])
+            student = students.get(item["student"])
+            subject = subjects.get(item["subject"])
+            if not exam or not student or not subject:
+                return Response(
+                    {"detail": "Student, subject, or exam not found."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
             if student.class_room_id != exam.class_room_id or subject.class_room_id != exam.class_room_id:
                 return Response(
                     {"detail": "Student, subject, and exam must belong to the same class."},
                     status=status.HTTP_400_BAD_REQUEST,
                 )
-            if is_result_published(student, exam):
+            if exam.is_published or (student.id, exam.id) in published:
                 return Response(
                     {"detail": "Cannot edit results after exam is published."},
                     status=status.HTTP_400_BAD_REQUEST,
                 )
-            result, was_created = Result.objects.update_or_create(
-                student=student,
-                subject=subject,
-                exam=exam,
-                defaults={
-                    "marks": item["marks"],
-                    "grade": grade_for_marks(item["marks"]),
-                    "uploaded_by": request.user,
-                },
+
+        keys = [(item["student"], item["subject"], item["exam"]) for item in items]
+        created_count, updated_count = upsert_results(
+            ((*key, item["marks"]) for key, item in zip(keys, items)),
+            request.user,
+            scales={exam.id: scale_for_exam(exam) for exam in exams.values()},
+        )
+        saved = {
+            (row["student_id"], row["subject_id"], row["exam_id"]): row
+            for row in ResultRowSerializer.values(
+                Result.objects.filter(student_id__in=students, subject_id__in=subjects, exam_id__in=exams)
             )
-            if was_created:
-                created_count += 1
-            else:
-                updated_count += 1
-            created.append(ResultSerializer(result).data)
+        }
         return Response(
             {
-                "results": created,
+                "results": ResultRowSerializer([saved[key] for key in keys]).data,
                 "created": created_count,
                 "updated": updated_count,
                 "total": created_count + updated_count,
@@ -153,7 +374,33 @@ class ResultBulkUploadView(APIView):
         )
 
 
-class StudentResultView(APIView):
+class ResultListView(KeysetPaginationMixin, RowSerializerListMixin, generics.ListAPIView):
+    """Results filtered by exam, class, student or subject, always cursor-paginated."""
+
+    queryset = Result.objects.all()
+    serializer_class = ResultSerializer
+    row_serializer_class = ResultRowSerializer
+    permission_classes = [HasPermission]
+    required_permission = "view_class_result"
+    keyset_ordering = ("exam", "student", "subject")
+    keyset_default = True
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        params = self.request.query_params
+        for param, lookup in (
+            ("exam", "exam_id"),
+            ("class_room", "student__class_room_id"),
+            ("student", "student_id"),
+            ("subject", "subject_id"),
+        ):
+            value = params.get(param)
+            if value:
+                queryset = queryset.filter(**{lookup: value})
+        return queryset
+
+
+class StudentResultView(ConditionalResultMixin, APIView):
     permission_classes = [HasPermission]
     required_permission = "view_student_result"
 
@@ -178,12 +425,43 @@ class StudentResultView(APIView):
             if not is_privileged and not is_result_published(student, exam):
                 return Response({"detail": "Results not published."}, status=status.HTTP_403_FORBIDDEN)
             results = results.filter(exam=exam)
-
-        serializer = ResultSerializer(results, many=True)
-        return Response(serializer.data)
-
-
-class ClassResultView(APIView):
+            snapshot = published_snapshot(exam)
+            if snapshot:
+                not_modified = self.check_validators(request, *snapshot_validators(snapshot, student.id))
+                if not_modified:
+                    return not_modified
+                return Response(snapshot_content(snapshot)["results"].get(str(student.id), []))
+
+        not_modified = self.not_modified(request, results)
+        if not_modified:
+            return not_modified
+        return Response(ResultRowSerializer(ResultRowSerializer.values(results)).data)
+
+
+CLASS_RESULT_CHUNK_SIZE = 1000
+
+
+def stream_class_results(results, totals, rankings):
+    """Yield the class result JSON document, encoding rows a chunk at a time.
+
+    Rows come from a server-side ``iterator()`` cursor, so memory stays flat
+    however many exams the class history spans.
+    """
+    dumps = partial(json.dumps, cls=JSONEncoder, ensure_ascii=False, separators=(",", ":"))
+    rows = ResultRowSerializer.values(results.order_by("exam_id", "student_id", "subject_id"))
+    rows = iter(ResultRowSerializer(rows.iterator(chunk_size=CLASS_RESULT_CHUNK_SIZE)))
+    yield '{"results":['
+    separator = ""
+    while True:
+        chunk = list(islice(rows, CLASS_RESULT_CHUNK_SIZE))
+        if not chunk:
+            break
+        yield separator + ",".join(map(dumps, chunk))
+        separator = ","
+    yield f'],"totals":{dumps(totals)},"rankings":{dumps(rankings)}}}'
+
+
+class ClassResultView(ConditionalResultMixin, APIView):
     permission_classes = [HasPermission]
     required_permission = "view_class_result"
 
@@ -192,12 +470,19 @@ class ClassResultView(APIView):
         results = Result.objects.filter(student__class_room_id=class_id)
         if exam_id:
             results = results.filter(exam_id=exam_id)
-        totals = results.values("student").annotate(total=Sum("marks"), average=Avg("marks"))
-        rankings = calculate_rankings(results)
-        return Response({"results": ResultSerializer(results, many=True).data, "totals": list(totals), "rankings": rankings})
+        not_modified = self.not_modified(request, results)
+        if not_modified:
+            return not_modified
+        totals, rankings = [], {}
+        for entry in ranked_totals(results, average=Avg("marks")):
+            totals.append({"student": entry["student_id"], "total": entry["total"], "average": entry["average"]})
+            rankings[entry["student_id"]] = entry["rank"]
+        return StreamingHttpResponse(
+            stream_class_results(results, totals, rankings), content_type="application/json"
+        )
 
 
-class ClassResultSheetView(APIView):
+class ClassResultSheetView(ConditionalResultMixin, APIView):
     permission_classes = [HasPermission]
     required_permission = "view_class_result"
 
@@ -207,7 +492,21 @@ class ClassResultSheetView(APIView):
             return Response({"detail": "exam_id is required"}, status=status.HTTP_400_BAD_REQUEST)
         class_room = get_object_or_404(ClassRoom, id=class_id)
         exam = get_object_or_404(Exam, id=exam_id, class_room=class_room)
-        sheet = build_class_result_sheet(
+        snapshot = published_snapshot(exam)
+        if snapshot:
+            not_modified = self.check_validators(request, *snapshot_validators(snapshot))
+            if not_modified:
+                return not_modified
+            return Response(snapshot_content(snapshot)["sheet"])
+        not_modified = self.not_modified(
+            request,
+            Result.objects.filter(exam=exam, student__class_room=class_room),
+            exam.published_at,
+            get_version(ROSTER_VERSION_KEY),
+        )
+        if not_modified:
+            return not_modified
+        sheet = cached_class_result_sheet(
             class_room,
             exam,
             include_marks=True,
@@ -217,7 +516,7 @@ class ClassResultSheetView(APIView):
         return Response(sheet)
 
 
-class PublicClassResultSheetView(APIView):
+class PublicClassResultSheetView(ConditionalResultMixin, APIView):
     permission_classes = [AllowAny]
 
     def get(self, request, class_id):
@@ -228,7 +527,27 @@ class PublicClassResultSheetView(APIView):
         exam = get_object_or_404(Exam, id=exam_id, class_room=class_room)
         if not exam.is_published:
             return Response({"detail": "Results not published."}, status=status.HTTP_403_FORBIDDEN)
-        sheet = build_class_result_sheet(
+        snapshot = published_snapshot(exam)
+        if snapshot:
+            not_modified = self.check_validators(request, *snapshot_validators(snapshot))
+            if not_modified:
+                return not_modified
+            sheet = mask_class_result_sheet(
+                snapshot_content(snapshot)["sheet"],
+                include_marks=False,
+                include_grades=True,
+                include_totals=False,
+            )
+            return Response(sheet)
+        not_modified = self.not_modified(
+            request,
+            Result.objects.filter(exam=exam, student__class_room=class_room),
+            exam.published_at,
+            get_version(ROSTER_VERSION_KEY),
+        )
+        if not_modified:
+            return not_modified
+        sheet = cached_class_result_sheet(
             class_room,
             exam,
             include_marks=False,
@@ -262,21 +581,20 @@ class SubjectResultSheetView(APIView):
             return Response({"detail": "Not allowed to access this subject."}, status=status.HTTP_403_FORBIDDEN)
         exam = get_object_or_404(Exam, id=exam_id, class_room=subject.class_room)
 
-        students = Student.objects.filter(class_room=subject.class_room).order_by(
-            "first_name", "last_name"
-        )
-        results = Result.objects.filter(exam=exam, subject=subject)
-        result_map = {result.student_id: result for result in results}
+        students = Student.objects.filter(class_room=subject.class_room).order_by("first_name", "last_name")
+        result_map = dict(Result.objects.filter(exam=exam, subject=subject).values_list("student_id", "marks"))
         rows = []
-        for student in students:
-            result = result_map.get(student.id)
+        for student_id, reg_no, first_name, last_name, gender in students.values_list(
+            "id", "reg_no", "first_name", "last_name", "gender"
+        ):
+            marks = result_map.get(student_id)
             rows.append(
                 {
-                    "student_id": student.id,
-                    "reg_no": student.reg_no or "",
-                    "full_name": f"{student.first_name} {student.last_name}".strip(),
-                    "gender": student.gender,
-                    "marks": str(result.marks) if result else "",
+                    "student_id": student_id,
+                    "reg_no": reg_no or "",
+                    "full_name": f"{first_name} {last_name}".strip(),
+                    "gender": gender,
+                    "marks": str(marks) if marks is not None else "",
                 }
             )
 
@@ -311,6 +629,27 @@ class SubjectResultSheetView(APIView):
         if not isinstance(rows, list):
             return Response({"detail": "Rows must be a list."}, status=status.HTTP_400_BAD_REQUEST)
 
+        student_ids = set()
+        reg_nos = set()
+        for row in rows:
+            if row.get("student_id"):
+                try:
+                    student_ids.add(int(row["student_id"]))
+                except (TypeError, ValueError):
+                    continue
+            elif (row.get("reg_no") or "").strip():
+                reg_nos.add(row["reg_no"].strip())
+        students = list(
+            Student.objects.filter(class_room=subject.class_room).filter(
+                Q(id__in=student_ids) | Q(reg_no__in=reg_nos)
+            )
+        )
+        students_by_id = {student.id: student for student in students}
+        students_by_reg_no = {student.reg_no: student for student in students if student.reg_no}
+        published_ids = set(
+            ResultPublication.objects.filter(exam=exam, student__in=students).values_list("student_id", flat=True)
+        )
+
         errors = []
         operations = []
         for index, row in enumerate(rows, start=1):
@@ -318,14 +657,17 @@ class SubjectResultSheetView(APIView):
             student_id = row.get("student_id")
             reg_no = (row.get("reg_no") or "").strip()
             if student_id:
-                student = Student.objects.filter(id=student_id, class_room=subject.class_room).first()
+                try:
+                    student = students_by_id.get(int(student_id))
+                except (TypeError, ValueError):
+                    student = None
             elif reg_no:
-                student = Student.objects.filter(reg_no=reg_no, class_room=subject.class_room).first()
+                student = students_by_reg_no.get(reg_no)
             if not student:
                 errors.append({"row": index, "error": "Student not found in class."})
                 continue
 
-            if is_result_published(student, exam):
+            if student.id in published_ids:
                 errors.append({"row": index, "error": "Results already published for this student."})
                 continue
 
@@ -345,25 +687,11 @@ class SubjectResultSheetView(APIView):
         if errors:
             return Response({"detail": "Validation errors.", "errors": errors}, status=status.HTTP_400_BAD_REQUEST)
 
-        created = 0
-        updated = 0
-        with transaction.atomic():
-            for student, marks in operations:
-                result, was_created = Result.objects.update_or_create(
-                    student=student,
-                    subject=subject,
-                    exam=exam,
-                    defaults={
-                        "marks": marks,
-                        "grade": grade_for_marks(marks),
-                        "uploaded_by": request.user,
-                    },
-                )
-                if was_created:
-                    created += 1
-                else:
-                    updated += 1
-
+        created, updated = upsert_results(
+            ((student.id, subject.id, exam.id, marks) for student, marks in operations),
+            request.user,
+            scales={exam.id: scale_for_exam(exam)},
+        )
         return Response({"created": created, "updated": updated, "total": created + updated})
 
 
@@ -378,7 +706,7 @@ class ClassResultCsvTemplateView(APIView):
         class_room = get_object_or_404(ClassRoom, id=class_id)
         exam = get_object_or_404(Exam, id=exam_id, class_room=class_room)
 
-        sheet = build_class_result_sheet(
+        sheet = cached_class_result_sheet(
             class_room,
             exam,
             include_marks=False,
@@ -428,128 +756,17 @@ class ClassResultCsvImportView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        subjects = list(Subject.objects.filter(class_room=class_room).order_by("name"))
-
-        content = upload.read().decode("utf-8-sig")
-        reader = csv.DictReader(StringIO(content))
-        if not reader.fieldnames:
-            return Response({"detail": "CSV header row is required."}, status=status.HTTP_400_BAD_REQUEST)
-
-        def normalize(value):
-            return "".join(str(value).strip().lower().split())
-
-        normalized_headers = {}
-        for header in reader.fieldnames:
-            key = normalize(header)
-            normalized_headers.setdefault(key, []).append(header)
-
-        def find_header(candidates):
-            for candidate in candidates:
-                key = normalize(candidate)
-                if key in normalized_headers:
-                    return normalized_headers[key][0]
-            return None
-
-        reg_no_header = find_header(["Reg no", "Reg No", "RegNo", "Registration No", "Reg #"])
-        student_id_header = find_header(["Student ID", "student_id", "student id", "ID"])
-        if not reg_no_header and not student_id_header:
-            return Response(
-                {"detail": "Missing 'Reg no' or 'Student ID' column in CSV."},
-                status=status.HTTP_400_BAD_REQUEST,
+        if wants_async(request):
+            job = enqueue(
+                "class_result_csv_import",
+                {"class_id": class_room.id, "exam_id": exam.id},
+                user=request.user,
+                input_file=upload,
             )
+            return job_accepted(job)
 
-        subject_marks_map = {}
-        missing_subjects = []
-        for subject in subjects:
-            name_key = normalize(subject.name)
-            code_key = normalize(subject.code or "")
-            mark_header = None
-            if name_key in normalized_headers:
-                mark_header = normalized_headers[name_key][0]
-            elif code_key in normalized_headers:
-                mark_header = normalized_headers[code_key][0]
-            if not mark_header:
-                missing_subjects.append(subject.name)
-            else:
-                subject_marks_map[mark_header] = subject
-
-        if missing_subjects:
-            return Response(
-                {"detail": "Missing subject columns in CSV.", "missing": missing_subjects},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-
-        errors = []
-        operations = []
-        for index, row in enumerate(reader, start=2):
-            student = None
-            if reg_no_header:
-                reg_no = (row.get(reg_no_header) or "").strip()
-                if reg_no:
-                    student = Student.objects.filter(reg_no=reg_no, class_room=class_room).first()
-                    if not student:
-                        errors.append({"row": index, "error": f"Reg no '{reg_no}' not found in class."})
-                        continue
-            if not student and student_id_header:
-                raw_student_id = (row.get(student_id_header) or "").strip()
-                if not raw_student_id:
-                    errors.append({"row": index, "error": "Student ID is required."})
-                    continue
-                try:
-                    student_id = int(raw_student_id)
-                except ValueError:
-                    errors.append({"row": index, "error": f"Invalid Student ID '{raw_student_id}'."})
-                    continue
-                student = Student.objects.filter(id=student_id, class_room=class_room).first()
-                if not student:
-                    errors.append({"row": index, "error": f"Student ID {student_id} not found in class."})
-                    continue
-
-            if not student:
-                errors.append({"row": index, "error": "Student identifier is required."})
-                continue
-
-            if is_result_published(student, exam):
-                errors.append({"row": index, "error": "Results already published for this student."})
-                continue
-
-            for header, subject in subject_marks_map.items():
-                raw_marks = (row.get(header) or "").strip()
-                if raw_marks == "":
-                    continue
-                try:
-                    marks = Decimal(raw_marks)
-                except Exception:
-                    errors.append({"row": index, "error": f"Invalid marks '{raw_marks}' for {header}."})
-                    continue
-                if marks < 0 or marks > 100:
-                    errors.append({"row": index, "error": f"Marks out of range for {header}."})
-                    continue
-                operations.append((student, subject, marks))
-
-        if errors:
-            return Response({"detail": "Validation errors in CSV.", "errors": errors}, status=status.HTTP_400_BAD_REQUEST)
-
-        created = 0
-        updated = 0
-        with transaction.atomic():
-            for student, subject, marks in operations:
-                result, was_created = Result.objects.update_or_create(
-                    student=student,
-                    subject=subject,
-                    exam=exam,
-                    defaults={
-                        "marks": marks,
-                        "grade": grade_for_marks(marks),
-                        "uploaded_by": request.user,
-                    },
-                )
-                if was_created:
-                    created += 1
-                else:
-                    updated += 1
-
-        return Response({"created": created, "updated": updated, "total": created + updated})
+        ok, data = import_class_results_csv(class_room, exam, upload, request.user)
+        return Response(data, status=status.HTTP_200_OK if ok else status.HTTP_400_BAD_REQUEST)
 
 
 class PublishExamView(APIView):
@@ -557,8 +774,10 @@ class PublishExamView(APIView):
     required_permission = "publish_result"
 
     def post(self, request, exam_id):
-        exam = Exam.objects.get(id=exam_id)
-        exam.publish(request.user)
+        exam = Exam.objects.select_related("class_room").get(id=exam_id)
+        with transaction.atomic():
+            exam.publish(request.user, scale_for_exam(exam).freeze())
+            create_result_snapshot(exam)
         return Response(ExamSerializer(exam).data)
 
 
@@ -586,7 +805,7 @@ class ReportCardPdfView(APIView):
     required_permission = "view_student_result"
 
     def get(self, request, student_id, exam_id):
-        student = Student.objects.get(id=student_id)
+        student = Student.objects.select_related("class_room").get(id=student_id)
         exam = Exam.objects.get(id=exam_id)
         permissions = get_user_permission_codes(request.user)
         is_privileged = request.user.is_superuser or any(
@@ -597,52 +816,41 @@ class ReportCardPdfView(APIView):
             return Response({"detail": "Not allowed to view this student."}, status=status.HTTP_403_FORBIDDEN)
         if not is_privileged and not is_result_published(student, exam):
             return Response({"detail": "Results not published."}, status=status.HTTP_403_FORBIDDEN)
-        results = Result.objects.filter(student=student, exam=exam)
-        total = results.aggregate(total=Sum("marks"))["total"] or Decimal("0")
-        average = results.aggregate(avg=Avg("marks"))["avg"] or Decimal("0")
-        average_grade = grade_for_marks(average) if results.exists() else ""
-        remarks = remarks_for_grade(average_grade) if average_grade else ""
-        rankings = calculate_rankings(
-            Result.objects.filter(student__class_room=student.class_room, exam=exam)
-        )
-        rank = rankings.get(student.id, "N/A")
-
-        buffer = BytesIO()
-        pdf = canvas.Canvas(buffer, pagesize=letter)
-        pdf.setFont("Helvetica-Bold", 16)
-        pdf.drawString(40, 750, settings.TUITION_NAME)
-        pdf.setFont("Helvetica", 12)
-        pdf.drawString(40, 730, f"Report Card: {exam.name} {exam.term} {exam.year}")
-        pdf.drawString(40, 710, f"Student: {student.first_name} {student.last_name}")
-        pdf.drawString(40, 690, f"Class: {student.class_room.name}")
-
-        y = 660
-        pdf.drawString(40, y, "Subject")
-        pdf.drawString(250, y, "Marks")
-        pdf.drawString(320, y, "Grade")
-        y -= 20
-        for result in results:
-            pdf.drawString(40, y, result.subject.name)
-            pdf.drawString(250, y, str(result.marks))
-            pdf.drawString(320, y, grade_for_marks(result.marks))
-            y -= 20
-            if y < 120:
-                pdf.showPage()
-                y = 750
-
-        pdf.drawString(40, y - 20, f"Total: {total}")
-        pdf.drawString(40, y - 40, f"Average: {average:.2f}")
-        pdf.drawString(40, y - 60, f"Avg Grade: {average_grade}")
-        pdf.drawString(40, y - 80, f"Remarks: {remarks}")
-        pdf.drawString(40, y - 100, f"Rank: {rank}")
-
-        pdf.showPage()
-        pdf.save()
-        buffer.seek(0)
-        return FileResponse(buffer, as_attachment=True, filename="report_card.pdf")
-
-
-class AnalyticsView(APIView):
+        cache = report_card_cache()
+        cache_key = report_card_cache_key(student, exam)
+        pdf = cache.get(cache_key)
+        if pdf is None:
+            snapshot = published_snapshot(exam)
+            card = snapshot_content(snapshot)["report_cards"].get(str(student.id)) if snapshot else None
+            if card is None:
+                results = Result.objects.filter(student=student, exam=exam).select_related("subject")
+                summary = StudentExamSummary.objects.filter(student=student, exam=exam).first()
+                card = report_card_data(student, exam, results, summary)
+            pdf = render_report_card(card)
+            cache.set(cache_key, pdf)
+        return FileResponse(BytesIO(pdf), as_attachment=True, filename="report_card.pdf")
+
+
+class ClassReportCardsView(APIView):
+    permission_classes = [HasPermission]
+    required_permission = "view_class_result"
+
+    def get(self, request, class_id, exam_id):
+        class_room = get_object_or_404(ClassRoom, id=class_id)
+        exam = get_object_or_404(Exam, id=exam_id, class_room=class_room)
+        if wants_async(request):
+            job = enqueue(
+                "class_report_cards", {"class_id": class_room.id, "exam_id": exam.id}, user=request.user
+            )
+            return job_accepted(job)
+        cards = published_report_cards(exam) or class_report_cards(class_room, exam)
+        response = StreamingHttpResponse(stream_zip(render_report_cards(cards)), content_type="application/zip")
+        filename = f"class_{class_id}_exam_{exam_id}_report_cards.zip"
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+
+class AnalyticsView(ConditionalResultMixin, APIView):
     permission_classes = [HasPermission]
     required_permission = "view_analytics"
 
@@ -652,4 +860,90 @@ class AnalyticsView(APIView):
             return Response({"detail": "exam_id is required"}, status=status.HTTP_400_BAD_REQUEST)
         exam = Exam.objects.get(id=exam_id)
         class_room = ClassRoom.objects.get(id=class_id)
+        not_modified = self.not_modified(
+            request,
+            Result.objects.filter(exam=exam, student__class_room=class_room),
+            exam.published_at,
+            get_version(ROSTER_VERSION_KEY),
+        )
+        if not_modified:
+            return not_modified
         return Response(analytics_for_class(class_room, exam))
+
+
+class AnalyticsExtendedView(ConditionalResultMixin, APIView):
+    permission_classes = [HasPermission]
+    required_permission = "view_analytics"
+
+    def get(self, request, class_id):
+        exam_id = request.query_params.get("exam_id")
+        if not exam_id:
+            return Response({"detail": "exam_id is required"}, status=status.HTTP_400_BAD_REQUEST)
+        class_room = get_object_or_404(ClassRoom, id=class_id)
+        exam = get_object_or_404(Exam, id=exam_id, class_room=class_room)
+        not_modified = self.not_modified(
+            request,
+            Result.objects.filter(exam=exam, student__class_room=class_room),
+            get_version(ROSTER_VERSION_KEY),
+        )
+        if not_modified:
+            return not_modified
+        return Response(class_statistics(class_room, exam))
+
+
+class PerformanceTrendsView(APIView):
+    permission_classes = [HasPermission]
+    required_permission = "view_analytics"
+
+    def get(self, request, class_id):
+        class_room = get_object_or_404(ClassRoom, id=class_id)
+        student_id = request.query_params.get("student_id")
+        if student_id and not student_id.isdigit():
+            return Response({"detail": "student_id must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(performance_trends(class_room, int(student_id) if student_id else None))
+
+
+class JobAccessMixin:
+    def get_job(self, request, job_id):
+        job = get_object_or_404(Job, id=job_id)
+        if not request.user.is_superuser and job.created_by_id != request.user.id:
+            raise Http404
+        return job
+
+
+class JobView(JobAccessMixin, APIView):
+    def get(self, request, job_id):
+        job = self.get_job(request, job_id)
+        data = JobSerializer(job).data
+        data["result_url"] = reverse("job-result", args=[job.id]) if job.is_finished else None
+        return Response(data)
+
+
+class JobResultView(JobAccessMixin, APIView):
+    def get(self, request, job_id):
+        job = self.get_job(request, job_id)
+        if not job.is_finished:
+            return Response(
+                {"detail": "Job has not finished yet.", "status": job.status},
+                status=status.HTTP_409_CONFLICT,
+            )
+        if job.status == Job.STATUS_FAILED:
+            return Response(
+                {"detail": job.error, "result": job.result}, status=status.HTTP_400_BAD_REQUEST
+            )
+        if job.output_file:
+            return FileResponse(
+                job.output_file.open("rb"),
+                as_attachment=True,
+                filename=os.path.basename(job.output_file.name),
+            )
+        return Response(job.result)
+
+
+@require_GET
+def metrics_view(request):
+    """Prometheus metrics for this process; needs ``METRICS_TOKEN`` as a bearer token and is off without one."""
+    token = settings.METRICS_TOKEN
+    if not token or not constant_time_compare(request.headers.get("Authorization", ""), f"Bearer {token}"):
+        return HttpResponse(status=status.HTTP_403_FORBIDDEN)
+    return HttpResponse(render_metrics(), content_type="text/plain; version=0.0.4; charset=utf-8")
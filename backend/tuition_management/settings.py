@@ -21,6 +21,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "core.middleware.PerformanceMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
@@ -63,6 +64,15 @@ DATABASES = {
     }
 }
 
+# Permission, exam and grading versions live in this cache, so every web and
+# worker process must share it; the database table needs `createcachetable`.
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv("DJANGO_CACHE_BACKEND", "django.core.cache.backends.db.DatabaseCache"),
+        "LOCATION": os.getenv("DJANGO_CACHE_LOCATION", "core_cache"),
+    }
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
     {"NAME": "django.contrib.auth.password_validation.MinimumLengthValidator"},
@@ -78,12 +88,14 @@ USE_TZ = True
 STATIC_URL = "/static/"
 STATIC_ROOT = BASE_DIR / "staticfiles"
 STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
+MEDIA_URL = "/media/"
+MEDIA_ROOT = os.getenv("MEDIA_ROOT", str(BASE_DIR / "media"))
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "core.authentication.PermissionClaimsJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
     "DEFAULT_PAGINATION_CLASS": "core.pagination.StandardResultsSetPagination",
@@ -99,7 +111,23 @@ SIMPLE_JWT = {
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
 }
 
+JWT_EMBED_PERMISSIONS = os.getenv("JWT_EMBED_PERMISSIONS", "False") == "True"
+
 CORS_ALLOW_ALL_ORIGINS = True
 
 TUITION_NAME = os.getenv("TUITION_NAME", "Bright Future Tuition Center")
 REG_NO_PREFIX = os.getenv("REG_NO_PREFIX", "BTC")
+CACHE_VERSION_TTL = float(os.getenv("CACHE_VERSION_TTL", "5"))
+PERMISSION_CACHE_TIMEOUT = int(os.getenv("PERMISSION_CACHE_TIMEOUT", "300"))
+RESULT_SHEET_CACHE_TIMEOUT = int(os.getenv("RESULT_SHEET_CACHE_TIMEOUT", "600"))
+GRADING_SCALE_CACHE_TTL = int(os.getenv("GRADING_SCALE_CACHE_TTL", "60"))
+REPORT_CARD_WORKERS = int(os.getenv("REPORT_CARD_WORKERS", "2"))
+REPORT_CARD_CACHE_DIR = os.getenv("REPORT_CARD_CACHE_DIR", str(BASE_DIR / "cache" / "report_cards"))
+REPORT_CARD_CACHE_MAX_BYTES = int(os.getenv("REPORT_CARD_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+JOB_WORKER_CONCURRENCY = int(os.getenv("JOB_WORKER_CONCURRENCY", "2"))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "2"))
+JOB_HEARTBEAT_INTERVAL = float(os.getenv("JOB_HEARTBEAT_INTERVAL", "30"))
+JOB_LEASE_TIMEOUT = int(os.getenv("JOB_LEASE_TIMEOUT", "300"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", str(DEBUG)) == "True"
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")